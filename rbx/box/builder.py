@@ -16,13 +16,14 @@ def build(
     verification: environment.VerificationParam,
     groups: Optional[Set[str]] = None,
     output: bool = True,
+    jobs: Optional[int] = None,
 ) -> None:
     with utils.StatusProgress(
         'Building testcases...',
         'Built [item]{processed}[/item] testcases...',
         keep=True,
     ) as s:
-        generate_testcases(s, groups=groups)
+        generate_testcases(s, groups=groups, jobs=jobs)
 
     with utils.StatusProgress(
         'Building outputs for testcases...',
@@ -30,7 +31,7 @@ def build(
         keep=True,
     ) as s:
         if output:
-            generate_outputs_for_testcases(s, groups=groups)
+            generate_outputs_for_testcases(s, groups=groups, jobs=jobs)
 
     if verification > 0:
         with utils.StatusProgress(
@@ -47,8 +48,10 @@ def build(
     )
 
 
-def verify(verification: environment.VerificationParam) -> bool:
-    build(verification=verification)
+def verify(
+    verification: environment.VerificationParam, jobs: Optional[int] = None
+) -> bool:
+    build(verification=verification, jobs=jobs)
 
     if verification < VerificationLevel.FAST_SOLUTIONS.value:
         return True
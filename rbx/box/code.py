@@ -62,12 +62,11 @@ def compile_item(code: CodeItem) -> str:
     compilation_options = get_compilation_config(language)
     file_mapping = get_file_mapping(language)
     dependency_cache = package.get_dependency_cache()
-    sandbox = package.get_singleton_sandbox()
     sandbox_params = get_sandbox_params_from_config(compilation_options.sandbox)
 
     if not compilation_options.commands:
         # Language is not compiled.
-        return sandbox.file_cacher.put_file_from_path(generator_path)
+        return package.get_file_cacher().put_file_from_path(generator_path)
 
     # Compile the generator
     commands = get_mapped_commands(compilation_options.commands, file_mapping)
@@ -94,13 +93,15 @@ def compile_item(code: CodeItem) -> str:
         )
     )
 
-    if not steps_with_caching.compile(
-        commands,
-        params=sandbox_params,
-        artifacts=artifacts,
-        sandbox=sandbox,
-        dependency_cache=dependency_cache,
-    ):
+    with package.acquire_sandbox() as sandbox:
+        compiled = steps_with_caching.compile(
+            commands,
+            params=sandbox_params,
+            artifacts=artifacts,
+            sandbox=sandbox,
+            dependency_cache=dependency_cache,
+        )
+    if not compiled:
         raise typer.Exit(1)
 
     assert compiled_digest.value is not None
@@ -124,7 +125,6 @@ def run_item(
         execution_options = merge_execution_configs([execution_options, extra_config])
     file_mapping = get_file_mapping(language)
     dependency_cache = package.get_dependency_cache()
-    sandbox = package.get_singleton_sandbox()
     sandbox_params = get_sandbox_params_from_config(execution_options.sandbox)
 
     sandbox_params.set_stdall(
@@ -175,11 +175,12 @@ def run_item(
     if outputs:
         artifacts.outputs.extend(outputs)
 
-    return steps_with_caching.run(
-        command,
-        params=sandbox_params,
-        sandbox=sandbox,
-        artifacts=artifacts,
-        dependency_cache=dependency_cache,
-        metadata=RunLogMetadata(language=code.language),
-    )
+    with package.acquire_sandbox() as sandbox:
+        return steps_with_caching.run(
+            command,
+            params=sandbox_params,
+            sandbox=sandbox,
+            artifacts=artifacts,
+            dependency_cache=dependency_cache,
+            metadata=RunLogMetadata(language=code.language),
+        )
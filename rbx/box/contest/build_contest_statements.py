@@ -29,7 +29,10 @@ from rbx.box.statements.joiners import (
     StatementJoiner,
     StatementJoinerContext,
 )
-from rbx.box.statements.schema import Statement, StatementType
+from rbx.box.statements.schema import (
+    Statement,
+    StatementType,
+)
 from rbx.box.testcases import get_samples
 
 
@@ -152,28 +155,59 @@ def _build_problem_statements(
     contest_cwd_absolute = pathlib.Path().resolve()
     contest_assets = get_relative_assets(statement.path, statement.assets)
 
+    overridden_params = (
+        {cfg.type: cfg for cfg in statement.override.configure}
+        if statement.override is not None
+        else {}
+    )
+
     for extracted_problem in extracted_problems:
         console.console.print(
             f'Building statement for problem {extracted_problem.problem.short_name}...'
         )
         with utils.new_cd(extracted_problem.problem.get_path()):
             contest_utils.clear_package_cache()
-            # TODO: respect steps override
-            content, _ = build_statements.build_statement_bytes(
+            digest = build_statements.get_statement_digest(
                 extracted_problem.statement,
                 extracted_problem.package,
                 output_type=output_type,
                 short_name=extracted_problem.problem.short_name,
-                overridden_params={
-                    cfg.type: cfg for cfg in statement.override.configure
-                }
-                if statement.override is not None
-                else {},  # overridden configure params
-                overridden_assets=contest_assets,  # overridden assets
+                overridden_params=overridden_params,
+                overridden_assets=contest_assets,
                 overridden_params_root=contest_cwd_absolute,
                 use_samples=use_samples,
                 is_editorial=is_editorial,
             )
+            cache_dir = build_statements.get_statement_cache_dir(
+                extracted_problem.statement,
+                output_type,
+                namespace='contest_statements',
+            )
+            cached_path = build_statements.get_cached_statement(cache_dir, digest)
+            if cached_path is not None:
+                console.console.print(
+                    f'Statement for problem {extracted_problem.problem.short_name} is up to date, skipping build.'
+                )
+                content = cached_path.read_bytes()
+            else:
+                # TODO: respect steps override
+                content, _ = build_statements.build_statement_bytes(
+                    extracted_problem.statement,
+                    extracted_problem.package,
+                    output_type=output_type,
+                    short_name=extracted_problem.problem.short_name,
+                    overridden_params=overridden_params,  # overridden configure params
+                    overridden_assets=contest_assets,  # overridden assets
+                    overridden_params_root=contest_cwd_absolute,
+                    use_samples=use_samples,
+                    is_editorial=is_editorial,
+                )
+                build_statements.cache_statement(
+                    cache_dir,
+                    digest,
+                    f'statement{output_type.get_file_suffix()}',
+                    content,
+                )
         dest_dir = root / '.problems' / extracted_problem.problem.short_name
         dest_path = dest_dir / f'statement{output_type.get_file_suffix()}'
         dest_dir.mkdir(parents=True, exist_ok=True)
@@ -10,13 +10,17 @@ from rbx.box.statements.schema import (
     StatementType,
 )
 
+# Patterns are compiled once by pydantic-core when the schema is built.
+_SHORT_NAME_PATTERN = r'^[A-Z]+[0-9]*$'
+_COLOR_PATTERN = r'^[A-Za-z0-9]+$'
+
 
 def ShortNameField(**kwargs):
-    return Field(pattern=r'^[A-Z]+[0-9]*$', min_length=1, max_length=4, **kwargs)
+    return Field(pattern=_SHORT_NAME_PATTERN, min_length=1, max_length=4, **kwargs)
 
 
 class ProblemStatementOverride(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', defer_build=True)
 
     configure: List[ConversionStep] = Field(
         [],
@@ -31,7 +35,7 @@ configure them in case they are applied.
 
 
 class ContestStatement(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', defer_build=True)
 
     language: str = Field('en', description='Language code for this statement.')
 
@@ -107,6 +111,8 @@ Can be glob pattern as well, such as `imgs/*.png`.
 
 
 class ContestProblem(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     short_name: str = ShortNameField(
         description="""
 Short name of the problem. Usually, just an uppercase letter,
@@ -122,7 +128,7 @@ If not specified, will expect the problem to be in ./{short_name}/ folder.""",
     color: Optional[str] = Field(
         default=None,
         description="""Hex-based color that represents this problem in the contest.""",
-        pattern=r'^[A-Za-z0-9]+$',
+        pattern=_COLOR_PATTERN,
         max_length=6,
     )
 
@@ -131,7 +137,7 @@ If not specified, will expect the problem to be in ./{short_name}/ folder.""",
 
 
 class Contest(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', defer_build=True)
 
     name: str = NameField(description='Name of this contest.')
 
@@ -1,20 +1,76 @@
-from typing import Annotated, List, Optional
+import concurrent.futures
+import io
+import multiprocessing
+import pathlib
+import typing
+from typing import Annotated, Dict, List, Optional, Tuple
 
 import typer
+from rich import text
 
 from rbx import annotations, console, utils
-from rbx.box import builder, environment
+from rbx.box import builder, environment, generators
 from rbx.box.contest import contest_utils
 from rbx.box.contest.build_contest_statements import build_statement
 from rbx.box.contest.contest_package import (
     find_contest_package_or_die,
     within_contest,
 )
+from rbx.box.contest.schema import Contest, ContestStatement
 from rbx.box.statements.schema import StatementType
 
 app = typer.Typer(no_args_is_help=True, cls=annotations.AliasGroup)
 
 
+def _build_problem_samples(
+    problem_path: pathlib.Path, verification: int, jobs: int
+) -> Tuple[str, int]:
+    # Runs in a worker process: capture the console output so it can be
+    # printed by the parent without interleaving with other problems.
+    console.console.file = io.StringIO()
+    exit_code = 0
+    try:
+        with utils.new_cd(problem_path):
+            contest_utils.clear_package_cache()
+            builder.build(verification=verification, groups=set(['samples']), jobs=jobs)
+    except typer.Exit as e:
+        exit_code = e.exit_code
+    return typing.cast(io.StringIO, console.console.file).getvalue(), exit_code
+
+
+def _build_samples(contest: Contest, verification: int):
+    if not contest.problems:
+        return
+    total_jobs = generators.get_default_jobs()
+    max_workers = min(len(contest.problems), total_jobs)
+    # Each problem build runs its own generator threads, so split the jobs
+    # between the worker processes instead of oversubscribing the CPUs.
+    jobs = max(1, total_jobs // max_workers)
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+    ) as executor:
+        futures = {
+            executor.submit(
+                _build_problem_samples,
+                problem.get_path().resolve(),
+                verification,
+                jobs,
+            ): problem
+            for problem in contest.problems
+        }
+        for future in concurrent.futures.as_completed(futures):
+            problem = futures[future]
+            output, exit_code = future.result()
+            console.console.print(
+                f'Processed problem [item]{problem.short_name}[/item].'
+            )
+            console.console.print(text.Text.from_ansi(output))
+            if exit_code != 0:
+                executor.shutdown(cancel_futures=True)
+                raise typer.Exit(exit_code)
+
+
 @app.command('build, b', help='Build statements.')
 @within_contest
 def build(
@@ -45,31 +101,23 @@ def build(
     contest = find_contest_package_or_die()
     # At most run the validators, only in samples.
     if samples:
-        for problem in contest.problems:
-            console.console.print(
-                f'Processing problem [item]{problem.short_name}[/item]...'
-            )
-            with utils.new_cd(problem.get_path()):
-                contest_utils.clear_package_cache()
-                builder.build(verification=verification, groups=set(['samples']))
+        _build_samples(contest, verification)
 
-    contest = find_contest_package_or_die()
-    candidate_languages = languages
-    if not candidate_languages:
-        candidate_languages = sorted(set([st.language for st in contest.statements]))
+    statements_by_language: Dict[str, ContestStatement] = {}
+    for st in contest.statements:
+        statements_by_language.setdefault(st.language, st)
+
+    candidate_languages = languages or sorted(statements_by_language)
 
     for language in candidate_languages:
-        candidates_for_lang = [
-            st for st in contest.statements if st.language == language
-        ]
-        if not candidates_for_lang:
+        if language not in statements_by_language:
             console.console.print(
                 f'[error]No contest-level statement found for language [item]{language}[/item].[/error]',
             )
             raise typer.Exit(1)
 
         build_statement(
-            candidates_for_lang[0],
+            statements_by_language[language],
             contest,
             output_type=output,
             use_samples=samples,
@@ -1,6 +1,6 @@
 import pathlib
 import shutil
-from typing import Annotated, Optional
+from typing import Annotated, List, Optional, Set
 
 import typer
 
@@ -61,12 +61,18 @@ def create(
         )
         raise typer.Exit(1)
 
-    shutil.copytree(str(problem_path), str(dest_path))
+    def ignore_left_overs(src: str, names: List[str]) -> Set[str]:
+        ignored = {'.preset-lock.yml', '__pycache__'}
+        if pathlib.Path(src) == problem_path:
+            ignored.update(['build', '.box'])
+        return ignored.intersection(names)
 
-    # Remove a few left overs.
-    shutil.rmtree(str(dest_path / 'build'), ignore_errors=True)
-    shutil.rmtree(str(dest_path / '.box'), ignore_errors=True)
-    for lock in dest_path.rglob('.preset-lock.yml'):
-        lock.unlink(missing_ok=True)
+    # Skip a few left overs instead of copying and removing them afterwards.
+    shutil.copytree(
+        str(problem_path),
+        str(dest_path),
+        ignore=ignore_left_overs,
+        copy_function=shutil.copy,
+    )
 
     presets.generate_lock(preset, root=dest_path)
@@ -1,10 +1,9 @@
 import pathlib
-import shutil
-from typing import Optional
+from typing import Callable, Optional
 
 import typer
 
-from rbx import annotations, console
+from rbx import annotations, console, utils
 from rbx.box import package
 from rbx.box.schema import CodeItem
 from rbx.config import get_builtin_checker, get_jngen, get_testlib
@@ -20,35 +19,38 @@ def get_local_artifact(name: str) -> Optional[steps.GradingFileInput]:
     return None
 
 
-def maybe_add_testlib(code: CodeItem, artifacts: steps.GradingArtifacts):
+def _maybe_add_header(
+    name: str,
+    fallback: Callable[[], steps.GradingFileInput],
+    code: CodeItem,
+    artifacts: steps.GradingArtifacts,
+):
     # Try to get from compilation files, then from package folder, then from tool.
-    artifact = get_local_artifact('testlib.h') or steps.testlib_grading_input()
-    compilation_files = package.get_compilation_files(code)
-    if any(dest == artifact.dest for _, dest in compilation_files):
+    compilation_dests = {dest for _, dest in package.get_compilation_files(code)}
+    if pathlib.Path(name) in compilation_dests:
         return
-    artifacts.inputs.append(artifact)
+    artifacts.inputs.append(get_local_artifact(name) or fallback())
+
+
+def maybe_add_testlib(code: CodeItem, artifacts: steps.GradingArtifacts):
+    _maybe_add_header('testlib.h', steps.testlib_grading_input, code, artifacts)
 
 
 def maybe_add_jngen(code: CodeItem, artifacts: steps.GradingArtifacts):
-    # Try to get from compilation files, then from package folder, then from tool.
-    artifact = get_local_artifact('jngen.h') or steps.jngen_grading_input()
-    compilation_files = package.get_compilation_files(code)
-    if any(dest == artifact.dest for _, dest in compilation_files):
-        return
-    artifacts.inputs.append(artifact)
+    _maybe_add_header('jngen.h', steps.jngen_grading_input, code, artifacts)
 
 
 @app.command('testlib', help='Download testlib.h')
 @package.within_problem
 def testlib():
-    shutil.copyfile(get_testlib(), pathlib.Path('testlib.h'))
+    utils.copyfile(get_testlib(), pathlib.Path('testlib.h'))
     console.console.print('Downloaded [item]testlib.h[/item] into current package.')
 
 
 @app.command('jngen', help='Download jngen.h')
 @package.within_problem
 def jngen():
-    shutil.copyfile(get_jngen(), pathlib.Path('jngen.h'))
+    utils.copyfile(get_jngen(), pathlib.Path('jngen.h'))
     console.console.print('Downloaded [item]jngen.h[/item] into current package.')
 
 
@@ -58,7 +60,7 @@ def checker(name: str):
     if not name.endswith('.cpp'):
         name = f'{name}.cpp'
     path = get_builtin_checker(name)
-    shutil.copyfile(path, pathlib.Path(name))
+    utils.copyfile(path, pathlib.Path(name))
     console.console.print(
         f'[success]Downloaded [item]{name}[/item] into current package.[/success]'
     )
@@ -1,7 +1,8 @@
 import functools
 import pathlib
+import string
 from enum import Enum
-from typing import Annotated, List, Optional, Type, TypeVar
+from typing import Annotated, Dict, List, Optional, Tuple, Type, TypeVar
 
 import typer
 from pydantic import BaseModel, ConfigDict
@@ -9,8 +10,6 @@ from pydantic import BaseModel, ConfigDict
 from rbx import config, console, utils
 from rbx.box.extensions import Extensions, LanguageExtensions
 from rbx.grading.judge.sandbox import SandboxBase, SandboxParams
-from rbx.grading.judge.sandboxes.isolate import IsolateSandbox
-from rbx.grading.judge.sandboxes.stupid_sandbox import StupidSandbox
 
 T = TypeVar('T', bound=BaseModel)
 
@@ -37,7 +36,7 @@ VerificationParam = Annotated[
 
 
 class FileMapping(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     # Path where to copy the stdin file to before running the program,
     # relative to the sandbox root.
@@ -61,7 +60,7 @@ class FileMapping(BaseModel):
 
 
 class EnvironmentSandbox(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     # Max. number of process to allow to run concurrently for the program.
     maxProcesses: Optional[int] = 1
@@ -89,6 +88,8 @@ class EnvironmentSandbox(BaseModel):
 
 
 class CompilationConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     # Commands to compile the program.
     commands: Optional[List[str]] = []
 
@@ -97,7 +98,7 @@ class CompilationConfig(BaseModel):
 
 
 class ExecutionConfig(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     # Command to run the program.
     command: Optional[str] = None
@@ -107,7 +108,7 @@ class ExecutionConfig(BaseModel):
 
 
 class EnvironmentLanguage(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     # Identifier of this language within this environment.
     name: str
@@ -145,7 +146,7 @@ class EnvironmentLanguage(BaseModel):
 
 
 class Environment(BaseModel):
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', frozen=True)
 
     # Default mapping for files within the sandbox. Fields in the mapping can be
     # individually overridden in the language configuration.
@@ -181,6 +182,10 @@ def get_local_environment_path() -> Optional[pathlib.Path]:
     return None
 
 
+def _load_environment(env_path: pathlib.Path) -> Environment:
+    return utils.model_from_yaml_cached(Environment, env_path, 'envs')
+
+
 @functools.cache
 def get_environment(env: Optional[str] = None) -> Environment:
     env_path = (
@@ -193,16 +198,24 @@ def get_environment(env: Optional[str] = None) -> Environment:
             f'Environment file [item]{env_path}[/item] not found.', style='error'
         )
         raise typer.Exit()
-    return utils.model_from_yaml(Environment, env_path.read_text())
+    return _load_environment(env_path)
 
 
 @functools.cache
-def get_language(name: str) -> EnvironmentLanguage:
+def _get_languages_by_name() -> Dict[str, EnvironmentLanguage]:
+    languages = {}
     for lang in get_environment().languages:
-        if lang.name == name:
-            return lang
-    console.console.print(f'Language [item]{name}[/item] not found.', style='error')
-    raise typer.Exit()
+        languages.setdefault(lang.name, lang)
+    return languages
+
+
+@functools.cache
+def get_language(name: str) -> EnvironmentLanguage:
+    languages = _get_languages_by_name()
+    if name not in languages:
+        console.console.print(f'Language [item]{name}[/item] not found.', style='error')
+        raise typer.Exit()
+    return languages[name]
 
 
 def install_environment(name: str, file: pathlib.Path):
@@ -219,20 +232,18 @@ def install_environment(name: str, file: pathlib.Path):
     )
 
 
-def _merge_shallow_models(model: Type[T], base: T, override: T) -> T:
-    return model(
-        **{
-            **base.model_dump(exclude_unset=True),
-            **override.model_dump(exclude_unset=True),
-        }
+def _merge_shallow_models(base: T, override: T) -> T:
+    # Both models are already valid, so skip re-validating the merged one.
+    return base.model_copy(
+        update={field: getattr(override, field) for field in override.model_fields_set}
     )
 
 
 def merge_compilation_configs(
     compilation_configs: List[Optional[CompilationConfig]],
 ) -> CompilationConfig:
-    merged_cfg = CompilationConfig()
-    merged_cfg.sandbox = EnvironmentSandbox(
+    commands = CompilationConfig().commands
+    sandbox = EnvironmentSandbox(
         maxProcesses=None,
         timeLimit=10000,
         wallTimeLimit=10000,
@@ -243,12 +254,10 @@ def merge_compilation_configs(
     for cfg in compilation_configs:
         if cfg is None:
             continue
-        merged_cfg.commands = cfg.commands or merged_cfg.commands
+        commands = cfg.commands or commands
         if cfg.sandbox is not None:
-            merged_cfg.sandbox = _merge_shallow_models(
-                EnvironmentSandbox, merged_cfg.sandbox, cfg.sandbox
-            )
-    return merged_cfg
+            sandbox = _merge_shallow_models(sandbox, cfg.sandbox)
+    return CompilationConfig(commands=commands, sandbox=sandbox)
 
 
 @functools.cache
@@ -262,17 +271,15 @@ def get_compilation_config(language: str) -> CompilationConfig:
 def merge_execution_configs(
     execution_configs: List[Optional[ExecutionConfig]],
 ) -> ExecutionConfig:
-    merged_cfg = ExecutionConfig()
-    merged_cfg.sandbox = EnvironmentSandbox()
+    command = ExecutionConfig().command
+    sandbox = EnvironmentSandbox()
     for cfg in execution_configs:
         if cfg is None:
             continue
-        merged_cfg.command = cfg.command or merged_cfg.command
+        command = cfg.command or command
         if cfg.sandbox is not None:
-            merged_cfg.sandbox = _merge_shallow_models(
-                EnvironmentSandbox, merged_cfg.sandbox, cfg.sandbox
-            )
-    return merged_cfg
+            sandbox = _merge_shallow_models(sandbox, cfg.sandbox)
+    return ExecutionConfig(command=command, sandbox=sandbox)
 
 
 @functools.cache
@@ -287,7 +294,6 @@ def get_execution_config(language: str) -> ExecutionConfig:
 def get_file_mapping(language: str) -> FileMapping:
     environment = get_environment()
     return _merge_shallow_models(
-        FileMapping,
         environment.defaultFileMapping or FileMapping(),
         get_language(language).fileMapping or FileMapping(),
     )
@@ -295,40 +301,80 @@ def get_file_mapping(language: str) -> FileMapping:
 
 @functools.cache
 def get_sandbox_type() -> Type[SandboxBase]:
+    # Only import the sandbox that is actually used.
     used_sandbox = get_environment().sandbox
-    if used_sandbox == 'stupid':
-        return StupidSandbox
     if used_sandbox == 'isolate':
+        from rbx.grading.judge.sandboxes.isolate import IsolateSandbox
+
         return IsolateSandbox
+    from rbx.grading.judge.sandboxes.stupid_sandbox import StupidSandbox
+
     return StupidSandbox
 
 
+@functools.lru_cache
+def _get_file_mapping_dict(mapping: FileMapping) -> Dict[str, str]:
+    return mapping.model_dump()
+
+
+@functools.lru_cache
+def _parse_command(command: str) -> Optional[Tuple[Tuple[str, Optional[str]], ...]]:
+    # Split the command into (literal, placeholder) pairs once. Returns None
+    # when the command uses format features other than plain placeholders.
+    parsed = []
+    for literal, field, spec, conversion in string.Formatter().parse(command):
+        if field is not None and (spec or conversion or not field.isidentifier()):
+            return None
+        parsed.append((literal, field))
+    return tuple(parsed)
+
+
+def _format_command(command: str, mapping_dict: Dict[str, str]) -> str:
+    parsed = _parse_command(command)
+    if parsed is None:
+        return command.format(**mapping_dict)
+    return ''.join(
+        literal if field is None else literal + mapping_dict[field]
+        for literal, field in parsed
+    )
+
+
 def get_mapped_commands(
     commands: List[str], mapping: Optional[FileMapping] = None
 ) -> List[str]:
-    mapping = mapping or FileMapping()
-    return [cmd.format(**mapping.model_dump()) for cmd in commands]
+    mapping_dict = _get_file_mapping_dict(mapping or FileMapping())
+    return [_format_command(cmd, mapping_dict) for cmd in commands]
 
 
 def get_mapped_command(command: str, mapping: Optional[FileMapping] = None) -> str:
     return get_mapped_commands([command], mapping)[0]
 
 
+@functools.lru_cache
+def _get_mirror_dir_paths(mirror_dirs: Tuple[str, ...]) -> Tuple[pathlib.Path, ...]:
+    return tuple(pathlib.Path(dir) for dir in mirror_dirs)
+
+
 def get_sandbox_params_from_config(
     config: Optional[EnvironmentSandbox],
 ) -> SandboxParams:
     config = config or EnvironmentSandbox()
     params = SandboxParams()
-    params.timeout = config.timeLimit
-    params.wallclock_timeout = config.wallTimeLimit
-    params.address_space = config.memoryLimit
+    if config.timeLimit is not None:
+        params.timeout = config.timeLimit
+    if config.wallTimeLimit is not None:
+        params.wallclock_timeout = config.wallTimeLimit
+    if config.memoryLimit is not None:
+        params.address_space = config.memoryLimit
+    # A `None` here means no limit on the number of processes, so it
+    # must override the default.
     params.max_processes = config.maxProcesses
-    params.fsize = config.fileSizeLimit
+    if config.fileSizeLimit is not None:
+        params.fsize = config.fileSizeLimit
     if config.preserveEnv:
         params.preserve_env = True
     if config.mirrorDirs:
-        for dir in config.mirrorDirs:
-            path = pathlib.Path(dir)
+        for path in _get_mirror_dir_paths(tuple(config.mirrorDirs)):
             params.add_mapped_directory(path)
     return params
 
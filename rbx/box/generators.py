@@ -1,12 +1,18 @@
+import concurrent.futures
+import fnmatch
+import functools
+import glob
+import os
 import pathlib
+import re
 import shlex
 import shutil
 from pathlib import PosixPath
-from typing import Callable, Dict, List, Optional, Set
+from typing import Callable, Dict, List, Optional, Set, Tuple, TypeVar
 
 import typer
 
-from rbx import console
+from rbx import console, utils
 from rbx.box import checkers, package, testcases, validators
 from rbx.box.code import compile_item, run_item
 from rbx.box.environment import (
@@ -17,6 +23,7 @@ from rbx.box.schema import (
     CodeItem,
     Generator,
     GeneratorCall,
+    Package,
     Testcase,
     TestcaseSubgroup,
 )
@@ -30,6 +37,36 @@ from rbx.grading.steps import (
 )
 from rbx.utils import StatusProgress
 
+T = TypeVar('T')
+
+# Script lines made only of characters that shlex never quotes.
+_SIMPLE_SCRIPT_LINE_RE = re.compile(
+    r'[A-Za-z0-9_@%+=:,./-]+(?:[ \t]+[A-Za-z0-9_@%+=:,./-]+)*'
+)
+
+
+def get_default_jobs() -> int:
+    # Default parallelism of every step that builds testcases and outputs.
+    return os.cpu_count() or 1
+
+
+def _run_in_parallel(
+    tasks: List[Callable[[], T]], step: Callable, jobs: Optional[int] = None
+) -> List[T]:
+    if not tasks:
+        return []
+    max_workers = min(len(tasks), jobs or get_default_jobs())
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(task) for task in tasks]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+                step()
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+    return [future.result() for future in futures]
+
 
 def _compile_generator(generator: CodeItem) -> str:
     return compile_item(generator)
@@ -50,15 +87,28 @@ def _get_group_output(
 def _copy_testcase_over(
     testcase: Testcase, group_path: pathlib.Path, subgroup_prefix: str, i: int
 ):
-    shutil.copy(
-        str(testcase.inputPath),
+    utils.copyfile(
+        testcase.inputPath,
         _get_group_input(group_path, subgroup_prefix, i),
     )
-    if testcase.outputPath is not None and testcase.outputPath.is_file():
-        shutil.copy(
-            str(testcase.outputPath),
-            _get_group_output(group_path, subgroup_prefix, i),
-        )
+    if testcase.outputPath is not None:
+        try:
+            utils.copyfile(
+                testcase.outputPath,
+                _get_group_output(group_path, subgroup_prefix, i),
+            )
+        except FileNotFoundError:
+            pass
+
+
+class GeneratorFailed(Exception):
+    def __init__(
+        self, i: int, group_path: pathlib.Path, stderr_text: Optional[str] = None
+    ):
+        super().__init__(f'Failed generating test {i} from group path {group_path}')
+        self.i = i
+        self.group_path = group_path
+        self.stderr_text = stderr_text
 
 
 def _run_generator(
@@ -79,15 +129,10 @@ def _run_generator(
     )
 
     if not run_log or run_log.exitcode != 0:
-        console.console.print(
-            f'[error]Failed generating test {i} from group path {group_path}[/error]',
-        )
+        stderr_text = None
         if generation_stderr.value is not None:
-            console.console.print('[error]Stderr:[/error]')
-            console.console.print(
-                package.get_digest_as_string(generation_stderr.value) or ''
-            )
-        raise typer.Exit(1)
+            stderr_text = package.get_digest_as_string(generation_stderr.value) or ''
+        raise GeneratorFailed(i, group_path, stderr_text)
 
 
 def get_all_built_testcases() -> Dict[str, List[Testcase]]:
@@ -113,11 +158,12 @@ def generate_output_for_testcase(
         return
 
     timelimit = pkg.timelimit_for_language(main_solution.language)
-    sandbox = EnvironmentSandbox()
-    sandbox.timeLimit = timelimit * 2
-    sandbox.wallTimeLimit = timelimit * 2
-    sandbox.memoryLimit = pkg.memorylimit_for_language(main_solution.language)
-    sandbox.fileSizeLimit = pkg.outputLimit
+    sandbox = EnvironmentSandbox(
+        timeLimit=timelimit * 2,
+        wallTimeLimit=timelimit * 2,
+        memoryLimit=pkg.memorylimit_for_language(main_solution.language),
+        fileSizeLimit=pkg.outputLimit,
+    )
     extra_config = ExecutionConfig(sandbox=sandbox)
 
     try:
@@ -166,7 +212,9 @@ def generate_output_for_testcase(
 
 
 def generate_outputs_for_testcases(
-    progress: Optional[StatusProgress] = None, groups: Optional[Set[str]] = None
+    progress: Optional[StatusProgress] = None,
+    groups: Optional[Set[str]] = None,
+    jobs: Optional[int] = None,
 ):
     def step():
         if progress is not None:
@@ -174,30 +222,41 @@ def generate_outputs_for_testcases(
 
     pkg = package.find_problem_package_or_die()
 
-    built_testcases = get_all_built_testcases()
     main_solution = package.get_main_solution()
     solution_digest: Optional[str] = None
 
-    if main_solution is not None:
-        if progress:
-            progress.update('Compiling main solution...')
-        try:
-            solution_digest = compile_item(main_solution)
-        except:
-            console.console.print('[error]Failed compiling main solution.[/error]')
-            raise
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        solution_future = None
+        if main_solution is not None:
+            if progress:
+                progress.update('Compiling main solution...')
+            solution_future = executor.submit(compile_item, main_solution)
+
+        # Looking up the built testcases does not depend on the main solution,
+        # so do it while the solution compiles.
+        built_testcases = get_all_built_testcases()
+
+        if solution_future is not None:
+            try:
+                solution_digest = solution_future.result()
+            except:
+                console.console.print('[error]Failed compiling main solution.[/error]')
+                raise
 
     gen_runs_dir = package.get_problem_runs_dir() / '.gen'
     shutil.rmtree(str(gen_runs_dir), ignore_errors=True)
     gen_runs_dir.mkdir(parents=True, exist_ok=True)
 
+    generation_tasks: List[Callable[[], None]] = []
     for group in pkg.testcases:
         if groups is not None and group.name not in groups:
             continue
         group_testcases = built_testcases[group.name]
 
         for testcase in group_testcases:
-            stderr_path = gen_runs_dir / 'main.stderr'
+            stderr_path = (
+                gen_runs_dir / f'{group.name}-{testcase.inputPath.stem}.stderr'
+            )
 
             assert testcase.outputPath is not None
             if main_solution is None or solution_digest is None:
@@ -206,23 +265,39 @@ def generate_outputs_for_testcases(
                 )
                 raise typer.Exit(1)
 
-            generate_output_for_testcase(solution_digest, testcase, stderr_path)
-            step()
+            generation_tasks.append(
+                functools.partial(
+                    generate_output_for_testcase,
+                    solution_digest,
+                    testcase,
+                    stderr_path,
+                )
+            )
+
+    _run_in_parallel(generation_tasks, step, jobs=jobs)
 
 
-def _run_generator_script(testcase: TestcaseSubgroup, cacher: FileCacher) -> str:
+def _run_generator_script(
+    testcase: TestcaseSubgroup,
+    cacher: FileCacher,
+    compiled_scripts: Optional[Dict[str, str]] = None,
+) -> str:
     assert testcase.generatorScript is not None
     script_digest = DigestHolder()
     if testcase.generatorScript.path.suffix == '.txt':
         script_digest.value = cacher.put_file_from_path(testcase.generatorScript.path)
     else:
-        try:
-            compiled_digest = compile_item(testcase.generatorScript)
-        except:
-            console.console.print(
-                f'[error]Failed compiling generator script for group [item]{testcase.name}[/item].[/error]'
-            )
-            raise
+        compiled_digest = (compiled_scripts or {}).get(
+            str(testcase.generatorScript.path)
+        )
+        if compiled_digest is None:
+            try:
+                compiled_digest = compile_item(testcase.generatorScript)
+            except:
+                console.console.print(
+                    f'[error]Failed compiling generator script for group [item]{testcase.name}[/item].[/error]'
+                )
+                raise
 
         run_stderr = DigestHolder()
         run_log = run_item(
@@ -253,61 +328,181 @@ def _run_generator_script(testcase: TestcaseSubgroup, cacher: FileCacher) -> str
 
 
 def _extract_script_lines(script: str):
-    lines = script.splitlines()
-    for line in lines:
+    for line in script.splitlines():
         line = line.strip()
-        if not line:
+        if not line or line.startswith('#'):
+            continue
+        if _SIMPLE_SCRIPT_LINE_RE.fullmatch(line):
+            # Nothing to unquote or quote back, so a plain split is equivalent.
+            parts = line.split()
+            yield parts[0], ' '.join(parts[1:])
             continue
-        if line.startswith('#'):
+        parts = shlex.split(line)
+        if not parts:
             continue
-        yield shlex.split(line)[0], shlex.join(shlex.split(line)[1:])
+        yield parts[0], shlex.join(parts[1:])
 
 
-def _get_necessary_generators(groups: Set[str], cacher: FileCacher) -> Set[str]:
-    pkg = package.find_problem_package_or_die()
+def _get_necessary_generators(
+    groups: Set[str],
+    scripts: Dict[str, str],
+    pkg: Optional[Package] = None,
+) -> Set[str]:
+    pkg = pkg or package.find_problem_package_or_die()
     existing_generators = set(generator.name for generator in pkg.generators)
 
-    necessary_generators = set()
-    for group in pkg.testcases:
-        if groups is not None and group.name not in groups:
-            continue
+    selected_subgroups = [
+        subgroup
+        for group in pkg.testcases
+        if groups is None or group.name in groups
+        for subgroup in [group] + group.subgroups
+    ]
 
-        for generator_call in group.generators:
+    necessary_generators = set()
+    for subgroup in selected_subgroups:
+        for generator_call in subgroup.generators:
             necessary_generators.add(generator_call.name)
+    if existing_generators <= necessary_generators:
+        # Every generator is already needed, no need to parse the scripts.
+        return existing_generators
 
-        if group.generatorScript is not None:
-            script = _run_generator_script(group, cacher)
+    for subgroup in selected_subgroups:
+        if subgroup.generatorScript is not None:
+            script = scripts[str(subgroup.generatorScript.path)]
             for generator_name, _ in _extract_script_lines(script):
                 necessary_generators.add(generator_name)
 
     return existing_generators.intersection(necessary_generators)
 
 
+def _compile_generator_or_die(generator: Generator) -> str:
+    try:
+        return _compile_generator(generator)
+    except:
+        console.console.print(
+            f'[error]Failed compiling generator [item]{generator.name}[/item].[/error]'
+        )
+        raise
+
+
 def compile_generators(
     progress: Optional[StatusProgress] = None,
     tracked_generators: Optional[Set[str]] = None,
+    pkg: Optional[Package] = None,
+    jobs: Optional[int] = None,
 ) -> Dict[str, str]:
     def update_status(text: str):
         if progress is not None:
             progress.update(text)
 
-    pkg = package.find_problem_package_or_die()
+    pkg = pkg or package.find_problem_package_or_die()
+
+    generators_to_compile = [
+        generator
+        for generator in pkg.generators
+        if tracked_generators is None or generator.name in tracked_generators
+    ]
+    if generators_to_compile:
+        names = ', '.join(generator.name for generator in generators_to_compile)
+        update_status(f'Compiling generators [item]{names}[/item]')
+
+    # Compilations are independent from each other, so run them concurrently.
+    compiled_digests = _run_in_parallel(
+        [
+            functools.partial(_compile_generator_or_die, generator)
+            for generator in generators_to_compile
+        ],
+        lambda: None,
+        jobs=jobs,
+    )
+    return {
+        generator.name: digest
+        for generator, digest in zip(generators_to_compile, compiled_digests)
+    }
 
-    generator_to_compiled_digest = {}
 
-    for generator in pkg.generators:
-        if tracked_generators is not None and generator.name not in tracked_generators:
+def _get_subgroups_with_generator_scripts(
+    pkg: Package, groups: Optional[Set[str]] = None
+) -> List[TestcaseSubgroup]:
+    # One subgroup per distinct generator script.
+    subgroups: Dict[str, TestcaseSubgroup] = {}
+    for group in pkg.testcases:
+        if groups is not None and group.name not in groups:
             continue
-        update_status(f'Compiling generator [item]{generator.name}[/item]')
-        try:
-            generator_to_compiled_digest[generator.name] = _compile_generator(generator)
-        except:
-            console.console.print(
-                f'[error]Failed compiling generator [item]{generator.name}[/item].[/error]'
-            )
-            raise
+        for subgroup in [group] + group.subgroups:
+            if subgroup.generatorScript is None:
+                continue
+            subgroups.setdefault(str(subgroup.generatorScript.path), subgroup)
+    return list(subgroups.values())
 
-    return generator_to_compiled_digest
+
+def _compile_generator_script_or_die(script: CodeItem) -> str:
+    try:
+        return compile_item(script)
+    except:
+        console.console.print(
+            f'[error]Failed compiling generator script [item]{script.path}[/item].[/error]'
+        )
+        raise
+
+
+def compile_generator_scripts(
+    progress: Optional[StatusProgress] = None,
+    groups: Optional[Set[str]] = None,
+    pkg: Optional[Package] = None,
+    jobs: Optional[int] = None,
+) -> Dict[str, str]:
+    pkg = pkg or package.find_problem_package_or_die()
+
+    scripts_to_compile = [
+        subgroup.generatorScript
+        for subgroup in _get_subgroups_with_generator_scripts(pkg, groups)
+        if subgroup.generatorScript is not None
+        and subgroup.generatorScript.path.suffix != '.txt'
+    ]
+    if scripts_to_compile and progress is not None:
+        paths = ', '.join(str(script.path) for script in scripts_to_compile)
+        progress.update(f'Compiling generator scripts [item]{paths}[/item]')
+
+    compiled_digests = _run_in_parallel(
+        [
+            functools.partial(_compile_generator_script_or_die, script)
+            for script in scripts_to_compile
+        ],
+        lambda: None,
+        jobs=jobs,
+    )
+    return {
+        str(script.path): digest
+        for script, digest in zip(scripts_to_compile, compiled_digests)
+    }
+
+
+def _run_generator_scripts(
+    compiled_scripts: Dict[str, str],
+    groups: Optional[Set[str]] = None,
+    pkg: Optional[Package] = None,
+    jobs: Optional[int] = None,
+) -> Dict[str, str]:
+    # Run every generator script once and keep its output, so it can be used
+    # both to find the necessary generators and to generate the testcases.
+    pkg = pkg or package.find_problem_package_or_die()
+    cacher = package.get_file_cacher()
+
+    subgroups = _get_subgroups_with_generator_scripts(pkg, groups)
+    contents = _run_in_parallel(
+        [
+            functools.partial(_run_generator_script, subgroup, cacher, compiled_scripts)
+            for subgroup in subgroups
+        ],
+        lambda: None,
+        jobs=jobs,
+    )
+    return {
+        str(subgroup.generatorScript.path): content
+        for subgroup, content in zip(subgroups, contents)
+        if subgroup.generatorScript is not None
+    }
 
 
 def generate_standalone(
@@ -366,15 +561,51 @@ def generate_standalone(
     return call.model_copy(update={'args': expanded_args_str})
 
 
+def _find_glob_inputs(
+    pattern: str, glob_cache: Dict[str, List[pathlib.Path]]
+) -> List[pathlib.Path]:
+    # Groups often share the same glob, so only walk the tree once per pattern.
+    if pattern in glob_cache:
+        return glob_cache[pattern]
+
+    directory, name_pattern = os.path.split(pattern)
+    if glob.has_magic(directory) or '**' in name_pattern:
+        matched_inputs = sorted(
+            path
+            for path in PosixPath().glob(pattern)
+            if path.suffix == '.in' and path.is_file()
+        )
+    else:
+        # Only the file name has wildcards, so a single scandir is enough, and
+        # its entries already carry the file type without an extra stat.
+        try:
+            with os.scandir(directory or '.') as entries:
+                names = sorted(
+                    entry.name
+                    for entry in entries
+                    if entry.name.endswith('.in')
+                    and fnmatch.fnmatchcase(entry.name, name_pattern)
+                    and entry.is_file()
+                )
+        except (FileNotFoundError, NotADirectoryError):
+            names = []
+        matched_inputs = [PosixPath(directory, name) for name in names]
+
+    glob_cache[pattern] = matched_inputs
+    return matched_inputs
+
+
 def _generate_testcases_for_subgroup(
     subgroup: TestcaseSubgroup,
     group_path: pathlib.Path,
     subgroup_prefix: str,
     compiled_generators: Dict[str, str],
+    scripts: Dict[str, str],
+    glob_cache: Dict[str, List[pathlib.Path]],
     step: Callable,
-):
-    cacher = package.get_file_cacher()
-
+) -> List[Callable[[], None]]:
+    # Copy static testcases over, and return the generator runs for the
+    # remaining ones, already bound to their testcase index.
     group_path.mkdir(parents=True, exist_ok=True)
 
     i = 0
@@ -386,47 +617,32 @@ def _generate_testcases_for_subgroup(
 
     # Glob testcases.
     if subgroup.testcaseGlob:
-        matched_inputs = sorted(PosixPath().glob(subgroup.testcaseGlob))
-
-        for input_path in matched_inputs:
-            if not input_path.is_file() or input_path.suffix != '.in':
-                continue
+        for input_path in _find_glob_inputs(subgroup.testcaseGlob, glob_cache):
             output_path = input_path.parent / f'{input_path.stem}.out'
             tc = Testcase(inputPath=input_path, outputPath=output_path)
             _copy_testcase_over(tc, group_path, subgroup_prefix, i)
             i += 1
             step()
 
-    # Run single generators.
-    for generator_call in subgroup.generators:
-        generator = package.get_generator(generator_call.name)
+    generator_calls: List[Tuple[str, Optional[str]]] = [
+        (generator_call.name, generator_call.args)
+        for generator_call in subgroup.generators
+    ]
+    if subgroup.generatorScript is not None:
+        script = scripts[str(subgroup.generatorScript.path)]
+        generator_calls.extend(_extract_script_lines(script))
+
+    # Run single generators, then each line from generator script.
+    tasks = []
+    for generator_name, args in generator_calls:
+        generator = package.get_generator(generator_name)
         if generator.name not in compiled_generators:
             console.console.print(f'Generator {generator.name} not compiled')
             raise typer.Exit(1)
 
-        _run_generator(
-            generator,
-            generator_call.args,
-            compiled_generators[generator.name],
-            group_path,
-            subgroup_prefix,
-            i,
-        )
-        i += 1
-        step()
-
-    # Run generator script.
-    if subgroup.generatorScript is not None:
-        script = _run_generator_script(subgroup, cacher)
-
-        # Run each line from generator script.
-        for generator_name, args in _extract_script_lines(script):
-            generator = package.get_generator(generator_name)
-            if generator.name not in compiled_generators:
-                console.console.print(f'Generator {generator.name} not compiled')
-                raise typer.Exit(1)
-
-            _run_generator(
+        tasks.append(
+            functools.partial(
+                _run_generator,
                 generator,
                 args,
                 compiled_generators[generator.name],
@@ -434,29 +650,42 @@ def _generate_testcases_for_subgroup(
                 subgroup_prefix,
                 i,
             )
-            i += 1
-            step()
+        )
+        i += 1
+    return tasks
 
 
 def generate_testcases(
-    progress: Optional[StatusProgress] = None, groups: Optional[Set[str]] = None
+    progress: Optional[StatusProgress] = None,
+    groups: Optional[Set[str]] = None,
+    jobs: Optional[int] = None,
 ):
     def step():
         if progress is not None:
             progress.step()
 
     pkg = package.find_problem_package_or_die()
-    cacher = package.get_file_cacher()
 
+    compiled_scripts = compile_generator_scripts(
+        progress, groups=groups, pkg=pkg, jobs=jobs
+    )
+    scripts = _run_generator_scripts(
+        compiled_scripts, groups=groups, pkg=pkg, jobs=jobs
+    )
     compiled_generators = compile_generators(
         progress=progress,
-        tracked_generators=_get_necessary_generators(groups, cacher)
+        tracked_generators=_get_necessary_generators(groups, scripts, pkg)
         if groups is not None
+        and any(group.name not in groups for group in pkg.testcases)
         else None,
+        pkg=pkg,
+        jobs=jobs,
     )
 
     testcases.clear_built_testcases()
 
+    glob_cache: Dict[str, List[pathlib.Path]] = {}
+    generation_tasks = []
     for testcase in pkg.testcases:
         if groups is not None and testcase.name not in groups:
             continue
@@ -464,8 +693,16 @@ def generate_testcases(
 
         if not testcase.subgroups:
             # Testcase group is itself a test subgroup.
-            _generate_testcases_for_subgroup(
-                testcase, group_path, '', compiled_generators, step
+            generation_tasks.extend(
+                _generate_testcases_for_subgroup(
+                    testcase,
+                    group_path,
+                    '',
+                    compiled_generators,
+                    scripts,
+                    glob_cache,
+                    step,
+                )
             )
             continue
 
@@ -473,6 +710,28 @@ def generate_testcases(
         subgroups = [renamed_testcase] + testcase.subgroups
         for i, subgroup in enumerate(subgroups):
             # Test subgroups were specified, use them.
-            _generate_testcases_for_subgroup(
-                subgroup, group_path, f'{i}-{subgroup.name}-', compiled_generators, step
+            generation_tasks.extend(
+                _generate_testcases_for_subgroup(
+                    subgroup,
+                    group_path,
+                    f'{i}-{subgroup.name}-',
+                    compiled_generators,
+                    scripts,
+                    glob_cache,
+                    step,
+                )
             )
+
+    # Generator calls are independent from each other, so run them concurrently.
+    # The first failure cancels the pending calls, and is only reported here
+    # so its diagnostics are not interleaved with other workers' output.
+    try:
+        _run_in_parallel(generation_tasks, step, jobs=jobs)
+    except GeneratorFailed as e:
+        console.console.print(
+            f'[error]Failed generating test {e.i} from group path {e.group_path}[/error]',
+        )
+        if e.stderr_text is not None:
+            console.console.print('[error]Stderr:[/error]')
+            console.console.print(e.stderr_text)
+        raise typer.Exit(1) from None
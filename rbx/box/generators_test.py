@@ -1,9 +1,16 @@
 import pathlib
+import shlex
+import threading
+import time
 
 import pytest
+import typer
 
 from rbx.box import package
 from rbx.box.generators import (
+    _extract_script_lines,
+    _find_glob_inputs,
+    _run_in_parallel,
     generate_outputs_for_testcases,
     generate_testcases,
 )
@@ -61,3 +68,141 @@ def test_generator_cache_works(
     assert (
         package.get_build_testgroup_path('gen1') / '1-gen-001.in'
     ).read_text() == '424242\n'
+
+
+@pytest.mark.test_pkg('box1')
+def test_generate_outputs_in_parallel(pkg_from_testdata: pathlib.Path):
+    generate_testcases()
+    generate_outputs_for_testcases(jobs=4)
+
+    # Debug when fail.
+    print_directory_tree(pkg_from_testdata)
+
+    group_path = package.get_build_testgroup_path('gen1')
+    inputs = sorted(group_path.glob('*.in'))
+    assert inputs
+    for input_path in inputs:
+        assert input_path.with_suffix('.out').is_file()
+
+
+@pytest.mark.parametrize(
+    'pattern',
+    [
+        'tests/*.in',
+        'tests/?.in',
+        'tests/[ab]*.in',
+        'tests/sub/*.in',
+        '*/*.in',
+        'tests/**/*.in',
+        '*.in',
+        'missing/*.in',
+    ],
+)
+def test_find_glob_inputs_matches_pathlib_glob(cleandir: pathlib.Path, pattern: str):
+    for name in [
+        'tests/a.in',
+        'tests/b.in',
+        'tests/ab.in',
+        'tests/c.in',
+        'tests/10.in',
+        'tests/a.out',
+        'tests/sub/d.in',
+        'other/e.in',
+        'root.in',
+    ]:
+        path = cleandir / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+    (cleandir / 'tests' / 'dir.in').mkdir()
+
+    expected = sorted(
+        path
+        for path in pathlib.Path().glob(pattern)
+        if path.suffix == '.in' and path.is_file()
+    )
+    assert _find_glob_inputs(pattern, {}) == expected
+
+
+def test_extract_script_lines_matches_shlex():
+    script = '\n'.join(
+        [
+            'gen1 1 2 3',
+            '  gen2\t--n=10  --seed=@a%b+c:d,e./f-g  ',
+            '',
+            '   ',
+            '# a comment',
+            '  # an indented comment',
+            'gen1 "quoted arg" 4',
+            "gen1 'single quoted' '' 5",
+            'gen1 escaped\\ space',
+            'gen1 1 # not a comment',
+            'gen1 a;b $HOME',
+            'gen3',
+        ]
+    )
+
+    expected = []
+    for line in script.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        parts = shlex.split(line)
+        expected.append((parts[0], shlex.join(parts[1:])))
+
+    assert list(_extract_script_lines(script)) == expected
+
+
+def test_run_in_parallel_cancels_pending_tasks_on_failure():
+    ran = []
+    lock = threading.Lock()
+
+    def fail():
+        raise ValueError('boom')
+
+    def succeed(i: int):
+        time.sleep(0.05)
+        with lock:
+            ran.append(i)
+
+    tasks = [fail] + [lambda i=i: succeed(i) for i in range(10)]
+    with pytest.raises(ValueError, match='boom'):
+        _run_in_parallel(tasks, lambda: None, jobs=1)
+
+    # At most the task picked up while the failure was being handled runs.
+    assert len(ran) <= 1
+
+
+def test_failing_generator_reports_a_single_error(
+    pkg_cleandir: pathlib.Path, capsys: pytest.CaptureFixture
+):
+    (pkg_cleandir / package.YAML_NAME).write_text(
+        'name: "test-problem"\n'
+        'timeLimit: 1000\n'
+        'memoryLimit: 256\n'
+        'generators:\n'
+        '  - name: "good"\n'
+        '    path: "good.py"\n'
+        '  - name: "bad"\n'
+        '    path: "bad.py"\n'
+        'testcases:\n'
+        '  - name: "main"\n'
+        '    generators:\n'
+        '      - name: "good"\n'
+        '      - name: "bad"\n'
+        '      - name: "good"\n'
+        '      - name: "good"\n'
+    )
+    (pkg_cleandir / 'good.py').write_text('print(1)\n')
+    (pkg_cleandir / 'bad.py').write_text(
+        'import sys\nprint("generator exploded", file=sys.stderr)\nsys.exit(1)\n'
+    )
+
+    with pytest.raises(typer.Exit) as exc_info:
+        generate_testcases(jobs=1)
+
+    assert exc_info.value.exit_code == 1
+    out = capsys.readouterr().out
+    assert out.count('Failed generating test') == 1
+    assert 'Failed generating test 1 ' in out
+    assert 'generator exploded' in out
+    assert 'Traceback' not in out
@@ -1,10 +1,40 @@
 # flake8: noqa
-from gevent import monkey
+import sys
+
+# Commands that never drive the sandboxes, and thus do not need gevent's
+# cooperative patching, which by itself adds ~150ms to startup. The patch
+# decision has to be taken before anything else is imported, so these names
+# are declared here and the commands below are registered under them.
+_EDIT_COMMAND = 'edit, e'
+_CREATE_COMMAND = 'create, c'
+_CLEAR_COMMAND = 'clear, clean'
+_ENVIRONMENT_COMMAND = 'environment, env'
+_ACTIVATE_COMMAND = 'activate'
+_LANGUAGES_COMMAND = 'languages'
+_PRESETS_COMMAND = 'presets'
+_DOWNLOAD_COMMAND = 'download'
+
+_UNPATCHED_COMMANDS = {
+    alias.strip()
+    for names in (
+        _EDIT_COMMAND,
+        _CREATE_COMMAND,
+        _CLEAR_COMMAND,
+        _ENVIRONMENT_COMMAND,
+        _ACTIVATE_COMMAND,
+        _LANGUAGES_COMMAND,
+        _PRESETS_COMMAND,
+        _DOWNLOAD_COMMAND,
+    )
+    for alias in names.split(',')
+} | {'--help'}
 
-monkey.patch_all()
+if len(sys.argv) < 2 or sys.argv[1] not in _UNPATCHED_COMMANDS:
+    from gevent import monkey
+
+    monkey.patch_all()
 
 import shlex
-import sys
 import typing
 
 from rbx.box.schema import CodeItem, ExpectedOutcome
@@ -17,7 +47,6 @@ from typing import Annotated, List, Optional
 import rich
 import rich.prompt
 import typer
-import questionary
 
 from rbx import annotations, config, console, utils
 from rbx.box import (
@@ -42,7 +71,6 @@ from rbx.box.solutions import (
     run_solutions,
 )
 from rbx.box.statements import build_statements
-from rbx.box.ui import main as ui_pkg
 
 app = typer.Typer(no_args_is_help=True, cls=annotations.AliasGroup)
 app.add_typer(
@@ -53,12 +81,15 @@ app.add_typer(
 )
 app.add_typer(
     download.app,
-    name='download',
+    name=_DOWNLOAD_COMMAND,
     cls=annotations.AliasGroup,
     help='Download an asset from supported repositories.',
 )
 app.add_typer(
-    presets.app, name='presets', cls=annotations.AliasGroup, help='Manage presets.'
+    presets.app,
+    name=_PRESETS_COMMAND,
+    cls=annotations.AliasGroup,
+    help='Manage presets.',
 )
 app.add_typer(
     packaging.app,
@@ -77,10 +108,12 @@ app.add_typer(
 @app.command('ui', hidden=True)
 @package.within_problem
 def ui():
+    from rbx.box.ui import main as ui_pkg
+
     ui_pkg.start()
 
 
-@app.command('edit, e', help='Open problem.rbx.yml in your default editor.')
+@app.command(_EDIT_COMMAND, help='Open problem.rbx.yml in your default editor.')
 @package.within_problem
 def edit():
     console.console.print('Opening problem definition in editor...')
@@ -90,16 +123,32 @@ def edit():
     config.open_editor(package.find_problem_yaml() or pathlib.Path())
 
 
+JobsParam = Annotated[
+    Optional[int],
+    typer.Option(
+        '--jobs',
+        '-j',
+        help='Number of jobs to run in parallel when building testcases and their outputs. Defaults to the number of CPUs.',
+    ),
+]
+
+
 @app.command('build, b', help='Build all tests for the problem.')
 @package.within_problem
-def build(verification: environment.VerificationParam):
-    builder.build(verification=verification)
+def build(
+    verification: environment.VerificationParam,
+    jobs: JobsParam = None,
+):
+    builder.build(verification=verification, jobs=jobs)
 
 
 @app.command('verify, v', help='Build and verify all the tests for the problem.')
 @package.within_problem
-def verify(verification: environment.VerificationParam):
-    if not builder.verify(verification=verification):
+def verify(
+    verification: environment.VerificationParam,
+    jobs: JobsParam = None,
+):
+    if not builder.verify(verification=verification, jobs=jobs):
         console.console.print('[error]Verification failed, check the report.[/error]')
 
 
@@ -232,7 +281,7 @@ def irun(
     )
 
 
-@app.command('create, c', help='Create a new problem package.')
+@app.command(_CREATE_COMMAND, help='Create a new problem package.')
 def create(
     name: str,
     preset: Annotated[
@@ -316,6 +365,8 @@ def stress(
             and group.generatorScript.path.suffix == '.txt'
         }
 
+        import questionary
+
         testgroup = questionary.select(
             'Choose the testgroup to add the tests to.\nOnly test groups that have a .txt generatorScript are shown below: ',
             choices=list(groups_by_name) + ['(skip)'],
@@ -348,7 +399,7 @@ def stress(
         break
 
 
-@app.command('environment, env', help='Set or show the current box environment.')
+@app.command(_ENVIRONMENT_COMMAND, help='Set or show the current box environment.')
 def environment_command(
     env: Annotated[Optional[str], typer.Argument()] = None,
     install_from: Annotated[
@@ -392,7 +443,7 @@ def environment_command(
 
 
 @app.command(
-    'activate',
+    _ACTIVATE_COMMAND,
     help='Activate the environment of the current preset used by the package.',
 )
 @cd.within_closest_package
@@ -420,7 +471,9 @@ def activate():
     console.console.print(f'[success]Preset [item]{preset.name}[/item] is activated.')
 
 
-@app.command('languages', help='List the languages available in this environment')
+@app.command(
+    _LANGUAGES_COMMAND, help='List the languages available in this environment'
+)
 def languages():
     env = environment.get_environment()
 
@@ -436,7 +489,7 @@ def languages():
         console.console.print()
 
 
-@app.command('clear, clean', help='Clears cache and build directories.')
+@app.command(_CLEAR_COMMAND, help='Clears cache and build directories.')
 @cd.within_closest_package
 def clear():
     console.console.print('Cleaning cache and build directories...')
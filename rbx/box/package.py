@@ -1,6 +1,12 @@
+import atexit
+import contextlib
+import dataclasses
 import functools
+import os
 import pathlib
-from typing import Dict, List, Optional, Tuple
+import queue
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import typer
 
@@ -59,14 +65,19 @@ def warn_preset_deactivated(root: pathlib.Path = pathlib.Path()):
 @functools.cache
 def find_problem_yaml(root: pathlib.Path = pathlib.Path()) -> Optional[pathlib.Path]:
     root = root.resolve()
-    problem_yaml_path = root / YAML_NAME
-    while root != pathlib.PosixPath('/') and not problem_yaml_path.is_file():
-        root = root.parent
-        problem_yaml_path = root / YAML_NAME
-    if not problem_yaml_path.is_file():
-        return None
-    warn_preset_deactivated(root)
-    return problem_yaml_path
+    for directory in (root, *root.parents):
+        problem_yaml_path = directory / YAML_NAME
+        if problem_yaml_path.is_file():
+            warn_preset_deactivated(directory)
+            return problem_yaml_path
+    return None
+
+
+def _load_package(problem_yaml_path: pathlib.Path) -> Package:
+    # Setting RBX_NO_PKG_CACHE forces the package to be parsed from scratch.
+    if os.environ.get('RBX_NO_PKG_CACHE'):
+        return utils.model_from_yaml(Package, problem_yaml_path.read_text())
+    return utils.model_from_yaml_cached(Package, problem_yaml_path, 'packages')
 
 
 @functools.cache
@@ -74,7 +85,7 @@ def find_problem_package(root: pathlib.Path = pathlib.Path()) -> Optional[Packag
     problem_yaml_path = find_problem_yaml(root)
     if not problem_yaml_path:
         return None
-    return utils.model_from_yaml(Package, problem_yaml_path.read_text())
+    return _load_package(problem_yaml_path)
 
 
 def find_problem_package_or_die(root: pathlib.Path = pathlib.Path()) -> Package:
@@ -110,7 +121,26 @@ def save_package(
     if not problem_yaml_path:
         console.console.print(f'[error]Problem not found in {root.absolute()}[/error]')
         raise typer.Exit(1)
-    problem_yaml_path.write_text(utils.model_to_yaml(package))
+    tmp_path = problem_yaml_path.with_suffix(f'.{os.getpid()}.tmp')
+    tmp_path.write_text(utils.model_to_yaml(package))
+    os.replace(tmp_path, problem_yaml_path)
+
+    # Drop everything derived from the previous package contents.
+    for fn in (
+        find_problem_package,
+        _pkg_indexes,
+        get_generator,
+        get_validator,
+        get_checker,
+        get_solutions,
+        get_main_solution,
+        get_solution,
+        get_solution_or_nil,
+        get_stress,
+        get_testgroup,
+        get_test_groups_by_name,
+    ):
+        fn.cache_clear()
 
 
 @functools.cache
@@ -127,6 +157,7 @@ def get_problem_storage_dir(root: pathlib.Path = pathlib.Path()) -> pathlib.Path
     return storage_dir
 
 
+@functools.cache
 def get_problem_runs_dir(root: pathlib.Path = pathlib.Path()) -> pathlib.Path:
     runs_dir = get_problem_cache_dir(root) / 'runs'
     runs_dir.mkdir(parents=True, exist_ok=True)
@@ -138,11 +169,21 @@ def get_cache_storage(root: pathlib.Path = pathlib.Path()) -> Storage:
     return FilesystemStorage(get_problem_storage_dir(root))
 
 
+_dependency_cache_lock = threading.Lock()
+
+
 @functools.cache
-def get_dependency_cache(root: pathlib.Path = pathlib.Path()) -> DependencyCache:
+def _get_dependency_cache(root: pathlib.Path) -> DependencyCache:
     return DependencyCache(get_problem_cache_dir(root), get_cache_storage(root))
 
 
+def get_dependency_cache(root: pathlib.Path = pathlib.Path()) -> DependencyCache:
+    # Opening the underlying shelve twice would corrupt it, so concurrent first
+    # callers must end up sharing a single instance.
+    with _dependency_cache_lock:
+        return _get_dependency_cache(root)
+
+
 @functools.cache
 def get_file_cacher(root: pathlib.Path = pathlib.Path()) -> FileCacher:
     return FileCacher(get_cache_storage(root))
@@ -165,8 +206,34 @@ def get_new_sandbox(root: pathlib.Path = pathlib.Path()) -> SandboxBase:
 
 
 @functools.cache
-def get_singleton_sandbox(root: pathlib.Path = pathlib.Path()) -> SandboxBase:
-    return get_new_sandbox(root)
+def _get_sandbox_pool(root: pathlib.Path) -> 'queue.SimpleQueue[SandboxBase]':
+    return queue.SimpleQueue()
+
+
+def _cleanup_sandbox(sandbox: SandboxBase):
+    # The sandbox directory may already be gone at exit, e.g. when it lived in
+    # a temporary directory that was removed first.
+    try:
+        sandbox.cleanup(delete=True)
+    except OSError:
+        pass
+
+
+@contextlib.contextmanager
+def acquire_sandbox(root: pathlib.Path = pathlib.Path()) -> Iterator[SandboxBase]:
+    # Sandboxes are not safe for concurrent use, so each caller holds one for
+    # itself and hands it back to the pool when done. This way concurrent
+    # workers, even across successive thread pools, reuse the same sandboxes.
+    pool = _get_sandbox_pool(root)
+    try:
+        sandbox = pool.get_nowait()
+    except queue.Empty:
+        sandbox = get_new_sandbox(root)
+        atexit.register(_cleanup_sandbox, sandbox)
+    try:
+        yield sandbox
+    finally:
+        pool.put(sandbox)
 
 
 @functools.cache
@@ -188,14 +255,43 @@ def get_build_testgroup_path(
     return res
 
 
+@dataclasses.dataclass
+class _PackageIndexes:
+    generators: Dict[str, Generator]
+    solutions_by_path: Dict[str, Solution]
+    stresses: Dict[str, Stress]
+    testgroups: Dict[str, TestcaseGroup]
+    main_solution: Optional[Solution]
+
+
+@functools.cache
+def _pkg_indexes(root: pathlib.Path = pathlib.Path()) -> _PackageIndexes:
+    pkg = find_problem_package_or_die(root)
+    main_solution = None
+    for solution in pkg.solutions:
+        if solution.outcome == ExpectedOutcome.ACCEPTED:
+            main_solution = solution
+            break
+    # setdefault keeps the first entry on duplicates, like the linear scans did.
+    indexes = _PackageIndexes({}, {}, {}, {}, main_solution)
+    for generator in pkg.generators:
+        indexes.generators.setdefault(generator.name, generator)
+    for solution in pkg.solutions:
+        indexes.solutions_by_path.setdefault(str(solution.path), solution)
+    for stress in pkg.stresses:
+        indexes.stresses.setdefault(stress.name, stress)
+    for testgroup in pkg.testcases:
+        indexes.testgroups.setdefault(testgroup.name, testgroup)
+    return indexes
+
+
 @functools.cache
 def get_generator(name: str, root: pathlib.Path = pathlib.Path()) -> Generator:
-    package = find_problem_package_or_die(root)
-    for generator in package.generators:
-        if generator.name == name:
-            return generator
-    console.console.print(f'[error]Generator [item]{name}[/item] not found[/error]')
-    raise typer.Exit(1)
+    generator = _pkg_indexes(root).generators.get(name)
+    if generator is None:
+        console.console.print(f'[error]Generator [item]{name}[/item] not found[/error]')
+        raise typer.Exit(1)
+    return generator
 
 
 @functools.cache
@@ -226,49 +322,43 @@ def get_solutions(root: pathlib.Path = pathlib.Path()) -> List[Solution]:
 
 @functools.cache
 def get_main_solution(root: pathlib.Path = pathlib.Path()) -> Optional[Solution]:
-    for solution in get_solutions(root):
-        if solution.outcome == ExpectedOutcome.ACCEPTED:
-            return solution
-    return None
+    return _pkg_indexes(root).main_solution
 
 
 @functools.cache
 def get_solution(name: str, root: pathlib.Path = pathlib.Path()) -> Solution:
-    for solution in get_solutions(root):
-        if str(solution.path) == name:
-            return solution
-    console.console.print(f'[error]Solution [item]{name}[/item] not found[/error]')
-    raise typer.Exit(1)
+    solution = _pkg_indexes(root).solutions_by_path.get(name)
+    if solution is None:
+        console.console.print(f'[error]Solution [item]{name}[/item] not found[/error]')
+        raise typer.Exit(1)
+    return solution
 
 
 @functools.cache
 def get_solution_or_nil(
     name: str, root: pathlib.Path = pathlib.Path()
 ) -> Optional[Solution]:
-    for solution in get_solutions(root):
-        if str(solution.path) == name:
-            return solution
-    return None
+    return _pkg_indexes(root).solutions_by_path.get(name)
 
 
 @functools.cache
 def get_stress(name: str, root: pathlib.Path = pathlib.Path()) -> Stress:
-    pkg = find_problem_package_or_die(root)
-    for stress in pkg.stresses:
-        if stress.name == name:
-            return stress
-    console.console.print(f'[error]Stress [item]{name}[/item] not found[/error]')
-    raise typer.Exit(1)
+    stress = _pkg_indexes(root).stresses.get(name)
+    if stress is None:
+        console.console.print(f'[error]Stress [item]{name}[/item] not found[/error]')
+        raise typer.Exit(1)
+    return stress
 
 
 @functools.cache
 def get_testgroup(name: str, root: pathlib.Path = pathlib.Path()) -> TestcaseGroup:
-    pkg = find_problem_package_or_die(root)
-    for testgroup in pkg.testcases:
-        if testgroup.name == name:
-            return testgroup
-    console.console.print(f'[error]Test group [item]{name}[/item] not found[/error]')
-    raise typer.Exit(1)
+    testgroup = _pkg_indexes(root).testgroups.get(name)
+    if testgroup is None:
+        console.console.print(
+            f'[error]Test group [item]{name}[/item] not found[/error]'
+        )
+        raise typer.Exit(1)
+    return testgroup
 
 
 @functools.cache
@@ -0,0 +1,31 @@
+import os
+import pathlib
+
+from rbx import testing_utils
+from rbx.box import package
+
+
+def _write_problem(time_limit: int):
+    pathlib.Path(package.YAML_NAME).write_text(
+        f'name: "test-problem"\ntimeLimit: {time_limit}\nmemoryLimit: 256\n'
+    )
+
+
+def test_package_cache_is_invalidated_on_edit(pkg_cleandir: pathlib.Path):
+    _write_problem(1000)
+    assert package.find_problem_package_or_die().timeLimit == 1000
+    yaml_stat = os.stat(package.YAML_NAME)
+
+    # Same size and same mtime: only the inode change time tells them apart.
+    _write_problem(2000)
+    os.utime(package.YAML_NAME, ns=(yaml_stat.st_atime_ns, yaml_stat.st_mtime_ns))
+    testing_utils.clear_all_functools_cache()
+
+    assert package.find_problem_package_or_die().timeLimit == 2000
+
+
+def test_package_cache_is_not_kept_in_package(pkg_cleandir: pathlib.Path):
+    _write_problem(1000)
+    package.find_problem_package_or_die()
+
+    assert not (pkg_cleandir / '.box' / '.pkg_cache.pkl').exists()
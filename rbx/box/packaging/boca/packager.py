@@ -1,15 +1,23 @@
+import os
 import pathlib
+import re
 import shutil
+import zipfile
 from math import fabs
-from typing import List
+from typing import List, Tuple
 
 import typer
 
-from rbx import console
+from rbx import console, utils
 from rbx.box import package
 from rbx.box.environment import get_extension_or_default
 from rbx.box.packaging.boca.extension import BocaExtension, BocaLanguage
-from rbx.box.packaging.packager import BasePackager, BuiltStatement
+from rbx.box.packaging.packager import (
+    BasePackager,
+    BuiltStatement,
+    write_file_to_zip,
+    write_str_to_zip,
+)
 from rbx.box.statements.schema import Statement
 from rbx.config import get_default_app_path, get_testlib
 
@@ -18,12 +26,22 @@ _MAX_REP_TIME = (
 )
 _MAX_REPS = 10  # Maximum number of reps to add
 
+_CHECKER_PLACEHOLDER_RE = re.compile(
+    r'\{\{(rbxFlags|testlib_content|checker_content)\}\}'
+)
+_COMPILE_PLACEHOLDER_RE = re.compile(r'umask 0022|\{\{rbxFlags\}\}')
+
 
 def test_time(time):
     return max(1, round(time))
 
 
 class BocaPackager(BasePackager):
+    def __init__(self, compress: bool = False):
+        # Testcases are often large and barely compressible, so by default they
+        # are stored as is, which is much faster to package.
+        self.compress = compress
+
     def _get_main_statement(self) -> Statement:
         pkg = package.find_problem_package_or_die()
 
@@ -139,13 +157,17 @@ class BocaPackager(BasePackager):
         checker_text = checker_path.read_text()
         testlib = get_testlib().read_text()
         checker = package.get_checker().path.read_text()
-        return (
-            checker_text.replace('{{rbxFlags}}', extension.flags_with_defaults()['cc'])
-            .replace('{{testlib_content}}', testlib)
-            .replace('{{checker_content}}', checker)
+        replacements = {
+            'rbxFlags': extension.flags_with_defaults()['cc'],
+            'testlib_content': testlib,
+            'checker_content': checker,
+        }
+        # Substitute in a single pass, the template embeds the whole testlib.
+        return _CHECKER_PLACEHOLDER_RE.sub(
+            lambda match: replacements[match.group(1)], checker_text
         )
 
-    def _get_compile(self, language: BocaLanguage) -> str:
+    def _get_compile(self, language: BocaLanguage, checker: str) -> str:
         extension = get_extension_or_default('boca', BocaExtension)
 
         compile_path = (
@@ -160,14 +182,14 @@ class BocaPackager(BasePackager):
         compile_text = compile_path.read_text()
 
         assert 'umask 0022' in compile_text
-        compile_text = compile_text.replace(
-            'umask 0022', 'umask 0022\n\n' + self._get_checker()
-        )
-
         flags = extension.flags_with_defaults()
-        if language in flags:
-            compile_text = compile_text.replace('{{rbxFlags}}', flags[language])
-        return compile_text
+
+        def substitute(match: re.Match) -> str:
+            if match.group(0) == 'umask 0022':
+                return 'umask 0022\n\n' + checker
+            return flags.get(language, match.group(0))
+
+        return _COMPILE_PLACEHOLDER_RE.sub(substitute, compile_text)
 
     def _copy_solutions(self, into_path: pathlib.Path):
         for solution in package.get_solutions():
@@ -199,30 +221,33 @@ class BocaPackager(BasePackager):
     def name(self) -> str:
         return 'boca'
 
-    def package(
-        self,
-        build_path: pathlib.Path,
-        into_path: pathlib.Path,
-        built_statements: List[BuiltStatement],
-    ) -> pathlib.Path:
+    def _get_zip_path(self, build_path: pathlib.Path) -> pathlib.Path:
+        return (build_path / self._get_problem_name()).with_suffix('.zip')
+
+    def prepare(self, build_path: pathlib.Path, into_path: pathlib.Path):
         extension = get_extension_or_default('boca', BocaExtension)
 
-        # Prepare limits
-        limits_path = into_path / 'limits'
-        limits_path.mkdir(parents=True, exist_ok=True)
-        for language in extension.languages:
-            (limits_path / language).write_text(self._get_limits(language))
+        # Per-language scripts are rendered in memory and written straight
+        # into the archive below.
+        scripts: List[Tuple[str, str]] = []
 
-        # Prepare compare
-        compare_path = into_path / 'compare'
-        compare_path.mkdir(parents=True, exist_ok=True)
-        for language in extension.languages:
-            (compare_path / language).write_text(self._get_compare())
+        # The compare script and the checker (which embeds testlib) are the
+        # same for every language.
+        compare = self._get_compare()
+        checker = self._get_checker()
 
-        # Prepare run
         run_path = into_path / 'run'
         run_path.mkdir(parents=True, exist_ok=True)
         for language in extension.languages:
+            # Prepare limits, compare, compile and tests
+            scripts.append((f'limits/{language}', self._get_limits(language)))
+            scripts.append((f'compare/{language}', compare))
+            scripts.append(
+                (f'compile/{language}', self._get_compile(language, checker))
+            )
+            scripts.append((f'tests/{language}', 'exit 0\n'))
+
+            # Prepare run
             run_orig_path = (
                 get_default_app_path() / 'packagers' / 'boca' / 'run' / language
             )
@@ -231,51 +256,83 @@ class BocaPackager(BasePackager):
                     f'[error]Run script for language [item]{language}[/item] not found.[/error]'
                 )
                 raise typer.Exit(1)
-            shutil.copyfile(run_orig_path, run_path / language)
-
-        # Prepare compile.
-        compile_path = into_path / 'compile'
-        compile_path.mkdir(parents=True, exist_ok=True)
-        for language in extension.languages:
-            (compile_path / language).write_text(self._get_compile(language))
-
-        # Prepare tests
-        tests_path = into_path / 'tests'
-        tests_path.mkdir(parents=True, exist_ok=True)
-        for language in extension.languages:
-            (tests_path / language).write_text('exit 0\n')
-
-        # Problem statement
-        description_path = into_path / 'description'
-        description_path.mkdir(parents=True, exist_ok=True)
-        (description_path / 'problem.info').write_text(self._get_problem_info())
-        shutil.copyfile(
-            self._get_main_built_statement(built_statements).path,
-            (description_path / self._get_problem_name()).with_suffix('.pdf'),
-        )
+            utils.copyfile(run_orig_path, run_path / language)
 
         # Copy solutions
         solutions_path = into_path / 'solutions'
         solutions_path.mkdir(parents=True, exist_ok=True)
         self._copy_solutions(solutions_path)
 
-        # Prepare IO
-        inputs_path = into_path / 'input'
-        inputs_path.mkdir(parents=True, exist_ok=True)
-        outputs_path = into_path / 'output'
-        outputs_path.mkdir(parents=True, exist_ok=True)
-
-        testcases = self.get_flattened_built_testcases()
-        for i, testcase in enumerate(testcases):
-            shutil.copyfile(testcase.inputPath, inputs_path / f'{i+1:03d}')
-            if testcase.outputPath is not None:
-                shutil.copyfile(testcase.outputPath, outputs_path / f'{i+1:03d}')
-            else:
-                (outputs_path / f'{i+1:03d}').touch()
-
-        # Zip all.
-        shutil.make_archive(
-            str(build_path / self._get_problem_name()), 'zip', into_path
+        # Scripts, testcases and the statement (appended in `package`) are
+        # written straight into the archive, only create their directories here.
+        for directory in [
+            'limits',
+            'compare',
+            'compile',
+            'tests',
+            'description',
+            'input',
+            'output',
+        ]:
+            (into_path / directory).mkdir(parents=True, exist_ok=True)
+
+        # Zip all but the statement.
+        testcase_compression = (
+            zipfile.ZIP_DEFLATED if self.compress else zipfile.ZIP_STORED
         )
+        with zipfile.ZipFile(
+            self._get_zip_path(build_path),
+            'w',
+            compression=zipfile.ZIP_DEFLATED,
+            compresslevel=1,
+        ) as zf:
+            for dirpath, dirnames, filenames in os.walk(into_path):
+                for name in sorted(dirnames) + sorted(filenames):
+                    path = pathlib.Path(dirpath) / name
+                    zf.write(path, path.relative_to(into_path))
+            for arcname, content in scripts:
+                write_str_to_zip(zf, arcname, content)
+
+            # Prepare IO
+            testcases = self.get_flattened_built_testcases()
+            names = [f'{i:03d}' for i in range(1, len(testcases) + 1)]
+            for name, testcase in zip(names, testcases):
+                write_file_to_zip(
+                    zf,
+                    testcase.inputPath,
+                    f'input/{name}',
+                    testcase_compression,
+                )
+                if testcase.outputPath is not None:
+                    write_file_to_zip(
+                        zf,
+                        testcase.outputPath,
+                        f'output/{name}',
+                        testcase_compression,
+                    )
+                else:
+                    write_str_to_zip(zf, f'output/{name}', '', testcase_compression)
 
-        return (build_path / self._get_problem_name()).with_suffix('.zip')
+    def package(
+        self,
+        build_path: pathlib.Path,
+        into_path: pathlib.Path,
+        built_statements: List[BuiltStatement],
+    ) -> pathlib.Path:
+        zip_path = self._get_zip_path(build_path)
+        with zipfile.ZipFile(
+            zip_path, 'a', compression=zipfile.ZIP_DEFLATED, compresslevel=1
+        ) as zf:
+            # Problem statement
+            write_str_to_zip(
+                zf,
+                'description/problem.info',
+                self._get_problem_info(),
+                zipfile.ZIP_DEFLATED,
+            )
+            zf.write(
+                self._get_main_built_statement(built_statements).path,
+                f'description/{self._get_problem_name()}.pdf',
+            )
+
+        return zip_path
@@ -1,6 +1,8 @@
+import concurrent.futures
+import os
 import pathlib
 import tempfile
-from typing import Type
+from typing import Tuple, Type
 
 import typer
 
@@ -11,6 +13,7 @@ from rbx.box.packaging.boca.packager import BocaPackager
 from rbx.box.packaging.packager import BasePackager, BuiltStatement
 from rbx.box.packaging.polygon.packager import PolygonPackager
 from rbx.box.statements.build_statements import build_statement
+from rbx.box.statements.schema import Statement, StatementType
 
 app = typer.Typer(no_args_is_help=True, cls=annotations.AliasGroup)
 
@@ -18,6 +21,7 @@ app = typer.Typer(no_args_is_help=True, cls=annotations.AliasGroup)
 def run_packager(
     packager_cls: Type[BasePackager],
     verification: environment.VerificationParam,
+    **kwargs,
 ) -> pathlib.Path:
     if not builder.verify(verification=verification):
         console.console.print(
@@ -26,23 +30,33 @@ def run_packager(
         raise typer.Exit(1)
 
     pkg = package.find_problem_package_or_die()
-    packager = packager_cls()
+    packager = packager_cls(**kwargs)
 
     statement_types = packager.statement_types()
-    built_statements = []
-
+    jobs = []
     for statement_type in statement_types:
         languages = packager.languages()
         for language in languages:
             statement = packager.get_statement_for_language(language)
-            statement_path = build_statement(statement, pkg, statement_type)
-            built_statements.append(
-                BuiltStatement(statement, statement_path, statement_type)
-            )
+            jobs.append((statement, statement_type))
+
+    def build_one(job: Tuple[Statement, StatementType]) -> BuiltStatement:
+        statement, statement_type = job
+        statement_path = build_statement(statement, pkg, statement_type)
+        return BuiltStatement(statement, statement_path, statement_type)
 
     console.console.print(f'Packaging problem for [item]{packager.name()}[/item]...')
 
+    # Each build runs in its own temporary directory and is mostly spent in
+    # external tools such as LaTeX, so run them concurrently, and meanwhile
+    # let the packager do the work that does not depend on them.
+    max_workers = max(1, min(len(jobs), os.cpu_count() or 1))
     with tempfile.TemporaryDirectory() as td:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            statement_futures = [executor.submit(build_one, job) for job in jobs]
+            packager.prepare(get_build_path(), pathlib.Path(td))
+            built_statements = [future.result() for future in statement_futures]
+
         result_path = packager.package(
             get_build_path(), pathlib.Path(td), built_statements
         )
@@ -57,12 +71,22 @@ def run_packager(
 @app.command('polygon', help='Build a package for Polygon.')
 def polygon(
     verification: environment.VerificationParam,
+    compress: bool = typer.Option(
+        False,
+        '--compress',
+        help='Whether to also compress testcases in the package.',
+    ),
 ):
-    run_packager(PolygonPackager, verification=verification)
+    run_packager(PolygonPackager, verification=verification, compress=compress)
 
 
 @app.command('boca', help='Build a package for BOCA.')
 def boca(
     verification: environment.VerificationParam,
+    compress: bool = typer.Option(
+        False,
+        '--compress',
+        help='Whether to also compress testcases in the package.',
+    ),
 ):
-    run_packager(BocaPackager, verification=verification)
+    run_packager(BocaPackager, verification=verification, compress=compress)
@@ -1,7 +1,12 @@
 import dataclasses
+import functools
 import pathlib
+import shutil
+import stat
+import time
+import zipfile
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from typing import Dict, List, Tuple, Union
 
 from rbx.box import package
 from rbx.box.contest import contest_package
@@ -10,6 +15,38 @@ from rbx.box.generators import get_all_built_testcases
 from rbx.box.schema import Package, Testcase, TestcaseGroup
 from rbx.box.statements.schema import Statement, StatementType
 
+ZIP_COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def write_str_to_zip(
+    zf: zipfile.ZipFile,
+    arcname: str,
+    content: Union[str, bytes],
+    compress_type: int = zipfile.ZIP_DEFLATED,
+):
+    info = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+    info.compress_type = compress_type
+    # Match the permissions of files written to disk and then zipped.
+    info.external_attr = (stat.S_IFREG | 0o644) << 16
+    zf.writestr(info, content)
+
+
+def write_file_to_zip(
+    zf: zipfile.ZipFile,
+    path: pathlib.Path,
+    arcname: str,
+    compress_type: int = zipfile.ZIP_DEFLATED,
+):
+    if compress_type != zipfile.ZIP_STORED:
+        zf.write(path, arcname, compress_type=compress_type)
+        return
+    # ZipFile.write copies in 8KiB chunks, which makes storing large testcases
+    # needlessly slow.
+    info = zipfile.ZipInfo.from_file(path, arcname)
+    info.compress_type = compress_type
+    with open(path, 'rb') as fsrc, zf.open(info, 'w') as fdst:
+        shutil.copyfileobj(fsrc, fdst, ZIP_COPY_BUFFER_SIZE)
+
 
 @dataclasses.dataclass
 class BuiltStatement:
@@ -48,6 +85,11 @@ class BasePackager(ABC):
     def statement_types(self) -> List[StatementType]:
         return [StatementType.PDF]
 
+    # Packaging work that does not depend on statements. Called before
+    # `package`, while statements are still being built.
+    def prepare(self, build_path: pathlib.Path, into_path: pathlib.Path):
+        return
+
     @abstractmethod
     def package(
         self,
@@ -58,9 +100,14 @@ class BasePackager(ABC):
         pass
 
     # Helper methods.
-    def get_built_testcases_per_group(self):
+    @functools.cached_property
+    def _built_testcases_per_group(self) -> Dict[str, List[Testcase]]:
+        # Testcases are built before packaging starts, so scan them only once.
         return get_all_built_testcases()
 
+    def get_built_testcases_per_group(self):
+        return self._built_testcases_per_group
+
     def get_built_testcases(self) -> List[Tuple[TestcaseGroup, List[Testcase]]]:
         pkg = package.find_problem_package_or_die()
         tests_per_group = self.get_built_testcases_per_group()
@@ -0,0 +1,164 @@
+import pathlib
+import zipfile
+from typing import List
+
+import pytest
+
+from rbx.box import package, schema
+from rbx.box.packaging import packager
+from rbx.box.packaging.boca import packager as boca_packager
+from rbx.box.packaging.polygon import packager as polygon_packager
+from rbx.box.packaging.polygon.packager import _merge_zip_into
+from rbx.box.statements.schema import StatementType
+
+
+@pytest.fixture
+def pkg_with_testcases(
+    pkg_cleandir: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> List[schema.Testcase]:
+    (pkg_cleandir / package.YAML_NAME).write_text(
+        'name: "test-problem"\n'
+        'timeLimit: 1000\n'
+        'memoryLimit: 256\n'
+        'checker:\n'
+        '  path: "checker.cpp"\n'
+        'statements:\n'
+        '  - title: "Test"\n'
+        '    path: "statement.pdf"\n'
+        '    type: "pdf"\n'
+        '    language: "en"\n'
+    )
+    (pkg_cleandir / 'checker.cpp').write_text('// checker\n')
+    (pkg_cleandir / 'statement.pdf').write_bytes(b'%PDF statement')
+    testlib = pkg_cleandir / 'testlib.h'
+    testlib.write_text('// testlib\n')
+    monkeypatch.setattr(boca_packager, 'get_testlib', lambda: testlib)
+    monkeypatch.setattr(polygon_packager, 'get_testlib', lambda: testlib)
+
+    tests_path = pkg_cleandir / 'tests'
+    tests_path.mkdir()
+    testcases = []
+    for i in range(2):
+        input_path = tests_path / f'{i}.in'
+        output_path = tests_path / f'{i}.out'
+        # Larger than the copy buffer, so stored entries take several chunks.
+        input_path.write_bytes(f'{i}\n'.encode() * packager.ZIP_COPY_BUFFER_SIZE)
+        output_path.write_text(f'{i}\n')
+        testcases.append(schema.Testcase(inputPath=input_path, outputPath=output_path))
+    testcases.append(schema.Testcase(inputPath=tests_path / '0.in'))
+    monkeypatch.setattr(
+        packager.BasePackager,
+        'get_flattened_built_testcases',
+        lambda self: testcases,
+    )
+    return testcases
+
+
+def _build_package(
+    pkg: packager.BasePackager, build_path: pathlib.Path
+) -> pathlib.Path:
+    into_path = build_path / 'into'
+    into_path.mkdir(parents=True)
+    pkg.prepare(build_path, into_path)
+    statement = package.find_problem_package_or_die().statements[0]
+    built_statement = packager.BuiltStatement(
+        statement, statement.path, StatementType.PDF
+    )
+    return pkg.package(build_path, into_path, [built_statement])
+
+
+def _check_testcases(
+    zf: zipfile.ZipFile,
+    testcases: List[schema.Testcase],
+    input_pattern: str,
+    output_pattern: str,
+    compress_type: int,
+):
+    for i, testcase in enumerate(testcases, start=1):
+        input_info = zf.getinfo(input_pattern.format(i))
+        output_info = zf.getinfo(output_pattern.format(i))
+        assert input_info.compress_type == compress_type
+        assert output_info.compress_type == compress_type
+        assert zf.read(input_info) == testcase.inputPath.read_bytes()
+        expected_output = (
+            testcase.outputPath.read_bytes() if testcase.outputPath else b''
+        )
+        assert zf.read(output_info) == expected_output
+
+
+@pytest.mark.parametrize(
+    'compress, compress_type',
+    [(False, zipfile.ZIP_STORED), (True, zipfile.ZIP_DEFLATED)],
+)
+def test_boca_package_zip(
+    pkg_with_testcases: List[schema.Testcase],
+    pkg_cleandir: pathlib.Path,
+    compress: bool,
+    compress_type: int,
+):
+    zip_path = _build_package(
+        boca_packager.BocaPackager(compress=compress), pkg_cleandir / 'build'
+    )
+
+    with zipfile.ZipFile(zip_path) as zf:
+        assert zf.testzip() is None
+        names = set(zf.namelist())
+        for directory in ['limits', 'compare', 'compile', 'tests', 'run']:
+            assert any(name.startswith(f'{directory}/') for name in names)
+        assert zf.read('description/test_problem.pdf') == b'%PDF statement'
+        assert 'fullname=Test' in zf.read('description/problem.info').decode()
+        assert b'// testlib' in zf.read('compile/cpp')
+        assert b'// checker' in zf.read('compile/cpp')
+        assert zf.getinfo('compile/cpp').compress_type == zipfile.ZIP_DEFLATED
+        _check_testcases(
+            zf, pkg_with_testcases, 'input/{:03d}', 'output/{:03d}', compress_type
+        )
+
+
+@pytest.mark.parametrize(
+    'compress, compress_type',
+    [(False, zipfile.ZIP_STORED), (True, zipfile.ZIP_DEFLATED)],
+)
+def test_polygon_package_zip(
+    pkg_with_testcases: List[schema.Testcase],
+    pkg_cleandir: pathlib.Path,
+    compress: bool,
+    compress_type: int,
+):
+    zip_path = _build_package(
+        polygon_packager.PolygonPackager(compress=compress), pkg_cleandir / 'build'
+    )
+
+    with zipfile.ZipFile(zip_path) as zf:
+        assert zf.testzip() is None
+        assert zf.read('files/testlib.h') == b'// testlib\n'
+        assert zf.read('files/check.cpp') == b'// checker\n'
+        assert zf.read('check.cpp') == b'// checker\n'
+        assert b'tests/%03d' in zf.read('problem.xml')
+        _check_testcases(
+            zf, pkg_with_testcases, 'tests/{:03d}', 'tests/{:03d}.a', compress_type
+        )
+
+
+def test_merge_zip_into_keeps_entries(tmp_path: pathlib.Path):
+    src = tmp_path / 'problem.zip'
+    large = b'1 2\n' * packager.ZIP_COPY_BUFFER_SIZE
+    with zipfile.ZipFile(src, 'w') as zf:
+        zf.writestr(zipfile.ZipInfo('files/'), b'')
+        packager.write_str_to_zip(zf, 'files/testlib.h', '// testlib\n')
+        packager.write_str_to_zip(zf, 'tests/001', large, zipfile.ZIP_STORED)
+
+    dest = tmp_path / 'contest.zip'
+    with zipfile.ZipFile(dest, 'w') as zf:
+        _merge_zip_into(zf, src, 'problems/A/')
+
+    with zipfile.ZipFile(src) as src_zf, zipfile.ZipFile(dest) as dest_zf:
+        assert dest_zf.testzip() is None
+        assert dest_zf.namelist() == [
+            f'problems/A/{name}' for name in src_zf.namelist()
+        ]
+        for info in src_zf.infolist():
+            dest_info = dest_zf.getinfo(f'problems/A/{info.filename}')
+            assert dest_info.compress_type == info.compress_type
+            assert dest_info.external_attr == info.external_attr
+            assert dest_zf.read(dest_info) == src_zf.read(info)
@@ -1,6 +1,7 @@
 import functools
 import pathlib
 import shutil
+import zipfile
 from typing import List
 
 import iso639
@@ -14,6 +15,8 @@ from rbx.box.packaging.packager import (
     BuiltContestStatement,
     BuiltProblemPackage,
     BuiltStatement,
+    write_file_to_zip,
+    write_str_to_zip,
 )
 from rbx.box.packaging.polygon import xml_schema as polygon_schema
 from rbx.config import get_testlib
@@ -35,6 +38,22 @@ def code_to_langs(langs: List[str]) -> List[str]:
     return [iso639.Language.from_part1(lang).name.lower() for lang in langs]
 
 
+def _merge_zip_into(zf: zipfile.ZipFile, src: pathlib.Path, prefix: str):
+    # Copy entries over keeping their compression, so that stored testcases
+    # are never compressed or unpacked to disk along the way.
+    with zipfile.ZipFile(src) as src_zf:
+        for info in src_zf.infolist():
+            dest_info = zipfile.ZipInfo(prefix + info.filename, info.date_time)
+            dest_info.compress_type = info.compress_type
+            dest_info.external_attr = info.external_attr
+            dest_info.file_size = info.file_size
+            if info.is_dir():
+                zf.writestr(dest_info, b'')
+                continue
+            with src_zf.open(info) as fsrc, zf.open(dest_info, 'w') as fdst:
+                shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+
+
 @functools.cache
 def _is_valid_lang_code(lang: str) -> bool:
     try:
@@ -49,6 +68,11 @@ def _is_valid_lang_code(lang: str) -> bool:
 
 
 class PolygonPackager(BasePackager):
+    def __init__(self, compress: bool = False):
+        # Testcases are often large and barely compressible, so by default they
+        # are stored as is, which is much faster to package.
+        self.compress = compress
+
     def _validate(self):
         langs = self.languages()
         pkg = package.find_problem_package_or_die()
@@ -129,13 +153,16 @@ class PolygonPackager(BasePackager):
         into_path: pathlib.Path,
     ) -> polygon_schema.Statement:
         language = code_to_langs([built_statement.statement.language])[0]
-        final_path = into_path / 'statements' / language / built_statement.path.name
+        relative_path = (
+            pathlib.Path('statements') / language / built_statement.path.name
+        )
+        final_path = into_path / relative_path
 
         final_path.parent.mkdir(parents=True, exist_ok=True)
         shutil.copyfile(built_statement.path, final_path)
 
         return polygon_schema.Statement(
-            path=str(final_path.resolve().relative_to(into_path.resolve())),
+            path=str(relative_path),
             language=language,
             type=self._statement_application_type(built_statement),  # type: ignore
         )
@@ -151,6 +178,43 @@ class PolygonPackager(BasePackager):
     def name(self) -> str:
         return 'polygon'
 
+    def prepare(self, build_path: pathlib.Path, into_path: pathlib.Path):
+        # Files and testcases are written straight into the archive, which is
+        # completed with the problem descriptor in `package`.
+        testcase_compression = (
+            zipfile.ZIP_DEFLATED if self.compress else zipfile.ZIP_STORED
+        )
+        with zipfile.ZipFile(
+            build_path / 'problem.zip',
+            'w',
+            compression=zipfile.ZIP_DEFLATED,
+            compresslevel=1,
+        ) as zf:
+            # Prepare files
+            zf.write(get_testlib(), 'files/testlib.h')
+            zf.write(package.get_checker().path, 'files/check.cpp')
+            zf.write(package.get_checker().path, 'check.cpp')
+
+            # Copy all testcases
+            testcases = self.get_flattened_built_testcases()
+            names = [f'{i:03d}' for i in range(1, len(testcases) + 1)]
+            for name, testcase in zip(names, testcases):
+                write_file_to_zip(
+                    zf,
+                    testcase.inputPath,
+                    f'tests/{name}',
+                    testcase_compression,
+                )
+                if testcase.outputPath is not None:
+                    write_file_to_zip(
+                        zf,
+                        testcase.outputPath,
+                        f'tests/{name}.a',
+                        testcase_compression,
+                    )
+                else:
+                    write_str_to_zip(zf, f'tests/{name}.a', '', testcase_compression)
+
     def package(
         self,
         build_path: pathlib.Path,
@@ -166,43 +230,22 @@ class PolygonPackager(BasePackager):
             # statements=self._process_statements(built_statements, into_path),
         )
 
-        descriptor: str = problem.to_xml(
+        # Already encoded as UTF-8, write it as is.
+        descriptor: bytes = problem.to_xml(
             skip_empty=True,
             encoding='utf-8',
             pretty_print=True,
             standalone=True,
         )  # type: ignore
-        if isinstance(descriptor, bytes):
-            descriptor = descriptor.decode()
-
-        # Prepare files
-        files_path = into_path / 'files'
-        files_path.mkdir(parents=True, exist_ok=True)
-        shutil.copyfile(get_testlib(), files_path / 'testlib.h')
-        shutil.copyfile(package.get_checker().path, files_path / 'check.cpp')
-        shutil.copyfile(package.get_checker().path, into_path / 'check.cpp')
-
-        # Copy all testcases
-        (into_path / 'tests').mkdir(parents=True, exist_ok=True)
-        testcases = self.get_flattened_built_testcases()
-        for i, testcase in enumerate(testcases):
-            shutil.copyfile(
-                testcase.inputPath,
-                into_path / f'tests/{i+1:03d}',
-            )
-            if testcase.outputPath is not None:
-                shutil.copyfile(
-                    testcase.outputPath,
-                    into_path / f'tests/{i+1:03d}.a',
-                )
-            else:
-                (into_path / f'tests/{i+1:03d}.a').touch()
 
         # Write problem.xml
-        (into_path / 'problem.xml').write_text(descriptor)
-
-        # Zip all.
-        shutil.make_archive(str(build_path / 'problem'), 'zip', into_path)
+        with zipfile.ZipFile(
+            build_path / 'problem.zip',
+            'a',
+            compression=zipfile.ZIP_DEFLATED,
+            compresslevel=1,
+        ) as zf:
+            write_str_to_zip(zf, 'problem.xml', descriptor)
 
         return build_path / 'problem.zip'
 
@@ -230,13 +273,16 @@ class PolygonContestPackager(BaseContestPackager):
         into_path: pathlib.Path,
     ) -> polygon_schema.Statement:
         language = code_to_langs([built_statement.statement.language])[0]
-        final_path = into_path / 'statements' / language / built_statement.path.name
+        relative_path = (
+            pathlib.Path('statements') / language / built_statement.path.name
+        )
+        final_path = into_path / relative_path
 
         final_path.parent.mkdir(parents=True, exist_ok=True)
         shutil.copyfile(built_statement.path, final_path)
 
         return polygon_schema.Statement(
-            path=str(final_path.resolve().relative_to(into_path.resolve())),
+            path=str(relative_path),
             language=language,
             type='application/pdf',  # type: ignore
         )
@@ -291,30 +337,34 @@ class PolygonContestPackager(BaseContestPackager):
             pkg_path = into_path / 'problems' / built_package.problem.short_name
             pkg_path.mkdir(parents=True, exist_ok=True)
 
-            shutil.unpack_archive(built_package.path, pkg_path, format='zip')
-
         # Build contest descriptor.
         contest = polygon_schema.Contest(
             names=self._get_names(),
             statements=self._process_statements(filtered_statements, into_path),
             problems=self._get_problems(built_packages),
         )
-        descriptor: str = contest.to_xml(
+        # Already encoded as UTF-8, write it as is.
+        descriptor: bytes = contest.to_xml(
             skip_empty=True,
             encoding='utf-8',
             pretty_print=True,
             standalone=True,
         )  # type: ignore
-        if isinstance(descriptor, bytes):
-            descriptor = descriptor.decode()
 
         # Write contest.xml
-        (into_path / 'contest.xml').write_text(descriptor)
+        (into_path / 'contest.xml').write_bytes(descriptor)
 
         # Write contest.dat
         (into_path / 'contest.dat').write_text(self._get_dat(built_packages))
 
-        # Zip all.
+        # Zip all, merging problem packages straight from their archives.
         shutil.make_archive(str(build_path / 'contest'), 'zip', into_path)
+        with zipfile.ZipFile(build_path / 'contest.zip', 'a') as zf:
+            for built_package in built_packages:
+                _merge_zip_into(
+                    zf,
+                    built_package.path,
+                    f'problems/{built_package.problem.short_name}/',
+                )
 
         return pathlib.Path('contest.zip')
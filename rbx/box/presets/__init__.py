@@ -3,7 +3,6 @@ import shutil
 import tempfile
 from typing import Annotated, Iterable, List, Optional, Sequence, Union
 
-import git
 import rich
 import rich.prompt
 import typer
@@ -177,9 +176,11 @@ def _build_package_locked_assets(
     res = []
     for tracked_asset in tracked_assets:
         asset_path = root / tracked_asset.path
-        if not asset_path.is_file():
+        try:
+            f = asset_path.open('rb')
+        except (FileNotFoundError, IsADirectoryError):
             continue
-        with asset_path.open('rb') as f:
+        with f:
             res.append(
                 LockedAsset(path=tracked_asset.path, hash=digest_cooperatively(f))
             )
@@ -244,7 +245,7 @@ def _copy_updated_assets(
     for asset in assets_to_copy:
         src_path = preset_package_path / asset.path
         dst_path = root / asset.path
-        shutil.copyfile(str(src_path), str(dst_path))
+        utils.copyfile(src_path, dst_path)
         console.console.print(
             f'Updated [item]{asset.path}[/item] from preset [item]{preset_name}[/item].'
         )
@@ -342,6 +343,8 @@ def install_from_remote(fetch_info: PresetFetchInfo, force: bool = False) -> str
         console.console.print(
             f'Cloning preset from [item]{fetch_info.fetch_uri}[/item]...'
         )
+        import git
+
         git.Repo.clone_from(fetch_info.fetch_uri, d)
         pd = pathlib.Path(d)
         if fetch_info.inner_dir:
@@ -131,20 +131,20 @@ def _run_solution_on_testcase(
     verification: VerificationLevel = VerificationLevel.NONE,
 ) -> Evaluation:
     pkg = package.find_problem_package_or_die()
-    actual_sandbox = package.get_singleton_sandbox()
+    use_soft_timeout = environment.get_sandbox_type().use_soft_timeout()
 
     timelimit = pkg.timelimit_for_language(solution.language)
 
-    sandbox = EnvironmentSandbox()
-    sandbox.timeLimit = timelimit
+    sandbox_timelimit = timelimit
     if verification.value >= VerificationLevel.FULL.value:
         # Use double TL.
-        sandbox.timeLimit = sandbox.timeLimit * 2
-    sandbox.wallTimeLimit = (
-        timelimit * 2 if actual_sandbox.use_soft_timeout() else sandbox.timeLimit
+        sandbox_timelimit = sandbox_timelimit * 2
+    sandbox = EnvironmentSandbox(
+        timeLimit=sandbox_timelimit,
+        wallTimeLimit=timelimit * 2 if use_soft_timeout else sandbox_timelimit,
+        memoryLimit=pkg.memorylimit_for_language(solution.language),
+        fileSizeLimit=pkg.outputLimit,
     )
-    sandbox.memoryLimit = pkg.memorylimit_for_language(solution.language)
-    sandbox.fileSizeLimit = pkg.outputLimit
     extra_config = ExecutionConfig(sandbox=sandbox)
 
     output_path = output_dir / testcase.inputPath.with_suffix('.out').name
@@ -1,13 +1,16 @@
+import hashlib
+import os
 import pathlib
+import shutil
 import tempfile
 import typing
 from typing import Annotated, Dict, List, Optional, Tuple
 
 import typer
 
-from rbx import annotations, console
+from rbx import annotations, console, utils
 from rbx.box import builder, environment, package
-from rbx.box.schema import Package
+from rbx.box.schema import Package, Testcase
 from rbx.box.statements.builders import (
     BUILDER_LIST,
     PROBLEM_BUILDER_LIST,
@@ -205,6 +208,109 @@ def get_relative_assets(
     return res
 
 
+def _check_statement_exists(statement: Statement):
+    if not statement.path.is_file():
+        console.console.print(
+            f'[error]Statement file [item]{statement.path}[/item] does not exist.[/error]'
+        )
+        raise typer.Exit(1)
+
+
+def _get_builder_assets(
+    statement: Statement,
+    bdr: StatementBuilder,
+    params: ConversionStep,
+    overridden_params_root: pathlib.Path,
+    overridden_params: Dict[ConversionType, ConversionStep],
+    overridden_assets: List[Tuple[pathlib.Path, pathlib.Path]],
+) -> List[Tuple[pathlib.Path, pathlib.Path]]:
+    assets = get_relative_assets(statement.path, statement.assets)
+
+    # Use either overridden assets (by contest) or usual assets.
+    # Remember to modify the root to contest root if that's the case.
+    if bdr.name() in overridden_params:
+        assets.extend(
+            bdr.inject_assets(overridden_params_root, overridden_params[bdr.name()])
+        )
+    else:
+        assets.extend(bdr.inject_assets(pathlib.Path(), params))
+    assets.extend(overridden_assets)
+    return assets
+
+
+def _get_statement_samples(use_samples: bool) -> List[Testcase]:
+    return get_samples() if use_samples else []
+
+
+def get_statement_digest(
+    statement: Statement,
+    pkg: Package,
+    output_type: Optional[StatementType] = None,
+    short_name: Optional[str] = None,
+    overridden_params_root: pathlib.Path = pathlib.Path(),
+    overridden_params: Optional[Dict[ConversionType, ConversionStep]] = None,
+    overridden_assets: Optional[List[Tuple[pathlib.Path, pathlib.Path]]] = None,
+    use_samples: bool = True,
+    is_editorial: bool = False,
+) -> str:
+    """Hash every input that affects `build_statement_bytes`.
+
+    Must be called from within the problem directory.
+    """
+    overridden_params = overridden_params or {}
+    overridden_assets = overridden_assets or []
+
+    _check_statement_exists(statement)
+    h = hashlib.blake2b()
+    h.update(utils.get_version().encode())
+    h.update(pkg.model_dump_json().encode())
+    h.update(statement.model_dump_json().encode())
+    h.update(statement.path.read_bytes())
+    h.update(
+        repr(
+            (
+                short_name,
+                output_type,
+                use_samples,
+                is_editorial,
+                sorted(
+                    (str(key), value.model_dump_json())
+                    for key, value in overridden_params.items()
+                ),
+                get_environment_languages_for_statement(),
+            )
+        ).encode()
+    )
+
+    builders = get_builders(
+        str(statement.path),
+        statement.steps,
+        statement.configure,
+        statement.type,
+        output_type,
+        builder_list=PROBLEM_BUILDER_LIST,
+    )
+    for bdr, params in builders:
+        h.update(bdr.name().encode())
+        assets = _get_builder_assets(
+            statement,
+            bdr,
+            params,
+            overridden_params_root,
+            overridden_params,
+            overridden_assets,
+        )
+        for asset_in, asset_out in sorted(assets):
+            h.update(str(asset_out).encode())
+            h.update(asset_in.read_bytes() if asset_in.is_file() else b'')
+
+    for sample in _get_statement_samples(use_samples):
+        h.update(sample.inputPath.read_bytes())
+        if sample.outputPath is not None and sample.outputPath.is_file():
+            h.update(sample.outputPath.read_bytes())
+    return h.hexdigest()
+
+
 def build_statement_bytes(
     statement: Statement,
     pkg: Package,
@@ -219,11 +325,7 @@ def build_statement_bytes(
     overridden_params = overridden_params or {}
     overridden_assets = overridden_assets or []
 
-    if not statement.path.is_file():
-        console.console.print(
-            f'[error]Statement file [item]{statement.path}[/item] does not exist.[/error]'
-        )
-        raise typer.Exit(1)
+    _check_statement_exists(statement)
     builders = get_builders(
         str(statement.path),
         statement.steps,
@@ -237,20 +339,14 @@ def build_statement_bytes(
     for bdr, params in builders:
         with tempfile.TemporaryDirectory() as td:
             # Here, create a new temp context for each builder call.
-            assets = get_relative_assets(statement.path, statement.assets)
-
-            # Use either overridden assets (by contest) or usual assets.
-            # Remember to modify the root to contest root if that's the case.
-            if bdr.name() in overridden_params:
-                assets.extend(
-                    bdr.inject_assets(
-                        overridden_params_root, overridden_params[bdr.name()]
-                    )
-                )
-            else:
-                assets.extend(bdr.inject_assets(pathlib.Path(), params))
-            assets.extend(overridden_assets)
-
+            assets = _get_builder_assets(
+                statement,
+                bdr,
+                params,
+                overridden_params_root,
+                overridden_params,
+                overridden_assets,
+            )
             prepare_assets(assets, pathlib.Path(td))
             output = bdr.build(
                 input=last_content,
@@ -263,7 +359,7 @@ def build_statement_bytes(
                 item=StatementBuilderProblem(
                     package=pkg,
                     statement=statement,
-                    samples=get_samples() if use_samples else [],
+                    samples=_get_statement_samples(use_samples),
                     short_name=short_name,
                 ),
                 verbose=False,
@@ -274,6 +370,51 @@ def build_statement_bytes(
     return last_content, last_output
 
 
+def get_statement_cache_dir(
+    statement: Statement,
+    output_type: Optional[StatementType],
+    namespace: str = 'statements',
+) -> pathlib.Path:
+    """Cache slot of a statement built into `output_type`.
+
+    A slot only holds the entry for the latest digest of its inputs.
+    Must be called from within the problem directory.
+    """
+    output = output_type.name if output_type is not None else 'default'
+    return (
+        package.get_problem_cache_dir()
+        / namespace
+        / f'{statement.language}-{statement.path.name}-{output}'
+    )
+
+
+def get_cached_statement(
+    cache_dir: pathlib.Path, digest: str
+) -> Optional[pathlib.Path]:
+    entry_dir = cache_dir / digest
+    if not entry_dir.is_dir():
+        return None
+    return next(entry_dir.iterdir(), None)
+
+
+def cache_statement(cache_dir: pathlib.Path, digest: str, name: str, content: bytes):
+    entry_dir = cache_dir / digest
+    # Populate the entry atomically. If a concurrent build got there first,
+    # its entry has the same contents, so keep it.
+    tmp_dir = cache_dir / f'{digest}.{os.getpid()}.tmp'
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    (tmp_dir / name).write_bytes(content)
+    try:
+        os.replace(tmp_dir, entry_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    # Evict the entries built from older inputs.
+    for path in cache_dir.iterdir():
+        if path != entry_dir and path.suffix != '.tmp':
+            shutil.rmtree(path, ignore_errors=True)
+
+
 def build_statement(
     statement: Statement,
     pkg: Package,
@@ -281,6 +422,27 @@ def build_statement(
     use_samples: bool = True,
     is_editorial: bool = False,
 ) -> pathlib.Path:
+    # Built statements are cached by the digest of their inputs, so rebuilding
+    # an unchanged statement (e.g. when packaging) skips LaTeX entirely.
+    digest = get_statement_digest(
+        statement,
+        pkg,
+        output_type=output_type,
+        use_samples=use_samples,
+        is_editorial=is_editorial,
+    )
+    cache_dir = get_statement_cache_dir(statement, output_type)
+    cached_path = get_cached_statement(cache_dir, digest)
+    if cached_path is not None:
+        console.console.print(
+            f'Statement for language [item]{statement.language}[/item] '
+            'is up to date, skipping build.'
+        )
+        statement_path = package.get_build_path() / cached_path.name
+        statement_path.parent.mkdir(parents=True, exist_ok=True)
+        utils.copyfile(cached_path, statement_path)
+        return statement_path
+
     last_content, last_output = build_statement_bytes(
         statement,
         pkg,
@@ -294,6 +456,8 @@ def build_statement(
     )
     statement_path.parent.mkdir(parents=True, exist_ok=True)
     statement_path.write_bytes(last_content)
+    cache_statement(cache_dir, digest, statement_path.name, last_content)
+
     console.console.print(
         f'Statement built successfully for language '
         f'[item]{statement.language}[/item] at '
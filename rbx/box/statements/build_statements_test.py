@@ -0,0 +1,62 @@
+import pathlib
+
+import pytest
+
+from rbx import testing_utils
+from rbx.box import package
+from rbx.box.statements import build_statements
+from rbx.box.statements.schema import StatementType
+
+
+@pytest.fixture
+def pkg_with_statement(pkg_cleandir: pathlib.Path) -> pathlib.Path:
+    (pkg_cleandir / package.YAML_NAME).write_text(
+        'name: "test-problem"\n'
+        'timeLimit: 1000\n'
+        'memoryLimit: 256\n'
+        'statements:\n'
+        '  - title: "Test"\n'
+        '    path: "statement.jinja.tex"\n'
+        '    type: "jinja-tex"\n'
+        '    language: "en"\n'
+    )
+    (pkg_cleandir / 'statement.jinja.tex').write_text('Hello \\VAR{problem.title}\n')
+    return pkg_cleandir
+
+
+def _build() -> pathlib.Path:
+    testing_utils.clear_all_functools_cache()
+    pkg = package.find_problem_package_or_die()
+    return build_statements.build_statement(
+        pkg.statements[0], pkg, StatementType.TeX, use_samples=False
+    )
+
+
+def _get_cache_dir() -> pathlib.Path:
+    pkg = package.find_problem_package_or_die()
+    return build_statements.get_statement_cache_dir(
+        pkg.statements[0], StatementType.TeX
+    )
+
+
+def test_statement_cache_hit(
+    pkg_with_statement: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    built = _build().read_text()
+
+    def fail(*args, **kwargs):
+        raise AssertionError('statement should not be rebuilt')
+
+    monkeypatch.setattr(build_statements, 'build_statement_bytes', fail)
+    assert _build().read_text() == built
+
+
+def test_statement_cache_miss_replaces_entry(pkg_with_statement: pathlib.Path):
+    assert 'Hello Test' in _build().read_text()
+
+    (pkg_with_statement / 'statement.jinja.tex').write_text(
+        'Goodbye \\VAR{problem.title}\n'
+    )
+
+    assert 'Goodbye Test' in _build().read_text()
+    assert len(list(_get_cache_dir().iterdir())) == 1
@@ -3,6 +3,7 @@ import io
 import os
 import pathlib
 import shelve
+import threading
 from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel
@@ -261,20 +262,25 @@ class DependencyCache:
         self.root = root
         self.storage = storage
         self.db = shelve.open(self._cache_name())
+        # shelve does not support concurrent access.
+        self.db_lock = threading.Lock()
         atexit.register(lambda: self.db.close())
 
     def _cache_name(self) -> str:
         return str(self.root / '.cache_db')
 
     def _find_in_cache(self, key: str) -> Optional[CacheFingerprint]:
-        return self.db.get(key)
+        with self.db_lock:
+            return self.db.get(key)
 
     def _store_in_cache(self, key: str, fingerprint: CacheFingerprint):
-        self.db[key] = fingerprint
+        with self.db_lock:
+            self.db[key] = fingerprint
 
     def _evict_from_cache(self, key: str):
-        if key in self.db:
-            del self.db[key]
+        with self.db_lock:
+            if key in self.db:
+                del self.db[key]
 
     def __call__(
         self,
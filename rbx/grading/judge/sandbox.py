@@ -327,7 +327,8 @@ class SandboxBase(abc.ABC):
         """
         pass
 
-    def use_soft_timeout(self) -> bool:
+    @classmethod
+    def use_soft_timeout(cls) -> bool:
         return False
 
     def relative_path(self, path: pathlib.Path) -> pathlib.Path:
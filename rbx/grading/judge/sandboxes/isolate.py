@@ -361,7 +361,8 @@ class IsolateSandbox(SandboxBase):
             return float(self.log['time-wall'][0])
         return None
 
-    def use_soft_timeout(self) -> bool:
+    @classmethod
+    def use_soft_timeout(cls) -> bool:
         return True
 
     def get_memory_used(self) -> Optional[int]:
@@ -132,7 +132,8 @@ class StupidSandbox(SandboxBase):
             return None
         return float(self.log['time-wall'])
 
-    def use_soft_timeout(self) -> bool:
+    @classmethod
+    def use_soft_timeout(cls) -> bool:
         return True
 
     def get_memory_used(self) -> Optional[int]:
@@ -14,6 +14,7 @@ from rbx.grading.judge.sandbox import SandboxBase, SandboxParams
 from rbx.grading.judge.storage import copyfileobj
 
 MAX_STDOUT_LEN = 1024 * 1024 * 128  # 128 MB
+OUTPUT_COPY_BUFFER_SIZE = 1024 * 1024  # 1 MiB
 
 
 class Outcome(Enum):
@@ -220,6 +221,7 @@ def _process_output_artifacts(
                 copyfileobj(
                     sb_f,
                     f,
+                    buffer_size=OUTPUT_COPY_BUFFER_SIZE,
                     maxlen=output_artifact.maxlen,
                 )
         if output_artifact.executable:
@@ -1,17 +1,23 @@
 import contextlib
+import errno
 import fcntl
+import hashlib
+import importlib.metadata
 import json
 import os
 import pathlib
+import pickle
 import resource
-from typing import Any, Optional, Type, TypeVar
+import shutil
+import sys
+import typing
+from typing import Any, Optional, Set, Tuple, Type, TypeVar
 
 import rich
 import rich.prompt
 import rich.status
 import typer
 import yaml
-from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from rich import text
 from rich.highlighter import JSONHighlighter
@@ -21,12 +27,43 @@ from rbx.console import console
 T = TypeVar('T', bound=BaseModel)
 APP_NAME = 'rbx'
 
+# `FICLONE` ioctl request from <linux/fs.h>.
+_FICLONE = 0x40049409
+_REFLINK_UNSUPPORTED_ERRNOS = (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL)
+# Set after the first copy rejected by the filesystem, so the following ones go
+# straight to a regular copy.
+_reflinks_unsupported = False
+
 
 def create_and_write(path: pathlib.Path, *args, **kwargs):
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(*args, **kwargs)
 
 
+def _is_same_file(src: pathlib.Path, dst: pathlib.Path) -> bool:
+    try:
+        return os.path.samefile(src, dst)
+    except OSError:
+        return False
+
+
+def copyfile(src: pathlib.Path, dst: pathlib.Path):
+    """Copy `src` into `dst`, sharing the underlying blocks when the filesystem
+    supports reflinks (Btrfs, XFS, ...) and falling back to a regular copy."""
+    global _reflinks_unsupported
+    # Leave copying a file onto itself to shutil, which refuses to do it
+    # instead of truncating the file.
+    if not _reflinks_unsupported and not _is_same_file(src, dst):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            return
+        except OSError as e:
+            if e.errno in _REFLINK_UNSUPPORTED_ERRNOS:
+                _reflinks_unsupported = True
+    shutil.copyfile(str(src), str(dst))
+
+
 def highlight_str(s: str) -> text.Text:
     txt = text.Text(s)
     JSONHighlighter().highlight(txt)
@@ -51,6 +88,48 @@ def normalize_with_underscores(s: str) -> str:
     return ''.join(final)
 
 
+def get_version() -> str:
+    try:
+        return importlib.metadata.version('rbx.cp')
+    except importlib.metadata.PackageNotFoundError:
+        return ''
+
+
+def _collect_model_modules(model: Type[BaseModel], modules: Set[str]):
+    for cls in model.__mro__:
+        if not issubclass(cls, BaseModel) or cls.__module__ in modules:
+            continue
+        modules.add(cls.__module__)
+        for field in cls.model_fields.values():
+            annotations = [field.annotation]
+            while annotations:
+                annotation = annotations.pop()
+                if isinstance(annotation, type):
+                    if issubclass(annotation, BaseModel):
+                        _collect_model_modules(annotation, modules)
+                    else:
+                        modules.add(annotation.__module__)
+                annotations.extend(typing.get_args(annotation))
+
+
+def get_model_source_key(model: Type[BaseModel]) -> Tuple:
+    """Identify the code defining `model` and every model nested in it.
+
+    Changes whenever rbx is upgraded or one of the modules declaring these
+    models is edited, which makes it suitable for keying on-disk caches of
+    validated models.
+    """
+    modules: Set[str] = set()
+    _collect_model_modules(model, modules)
+    sources = []
+    for name in sorted(modules):
+        path = getattr(sys.modules[name], '__file__', None)
+        if path is None or not name.startswith(APP_NAME):
+            continue
+        sources.append((name, pathlib.Path(path).stat().st_mtime_ns))
+    return (get_version(), tuple(sources))
+
+
 def get_app_path() -> pathlib.Path:
     app_dir = typer.get_app_dir(APP_NAME)
     return pathlib.Path(app_dir)
@@ -70,6 +149,9 @@ def model_json(model: BaseModel) -> str:
 
 
 def model_to_yaml(model: BaseModel) -> str:
+    # fastapi is slow to import and only needed here, keep it off startup.
+    from fastapi.encoders import jsonable_encoder
+
     path = ensure_schema(model.__class__)
     return f'# yaml-language-server: $schema={path}\n\n' + yaml.dump(
         jsonable_encoder(
@@ -81,7 +163,47 @@ def model_to_yaml(model: BaseModel) -> str:
 
 def model_from_yaml(model: Type[T], s: str) -> T:
     ensure_schema(model)
-    return model(**yaml.safe_load(s))
+    return model.model_validate(yaml.safe_load(s))
+
+
+def _get_yaml_cache_key(model: Type[BaseModel], path: pathlib.Path) -> Tuple:
+    path_stat = path.stat()
+    return (
+        path_stat.st_ino,
+        path_stat.st_size,
+        path_stat.st_mtime_ns,
+        path_stat.st_ctime_ns,
+        get_model_source_key(model),
+    )
+
+
+def model_from_yaml_cached(model: Type[T], path: pathlib.Path, namespace: str) -> T:
+    """Parse the YAML file at `path`, reusing a pickle of a previous parse.
+
+    The pickles are kept in the app directory and never next to `path`, so a
+    crafted cache file shipped alongside a package is never loaded.
+    """
+    path = path.resolve()
+    digest = hashlib.sha256(str(path).encode()).hexdigest()
+    cache_path = get_app_path() / '.cache' / namespace / f'{digest}.pkl'
+    key = _get_yaml_cache_key(model, path)
+    if cache_path.is_file():
+        try:
+            with cache_path.open('rb') as f:
+                cached_key, cached = pickle.load(f)
+            if cached_key == key and isinstance(cached, model):
+                return cached
+        except Exception:
+            # Corrupted or incompatible cache, fall back to parsing the YAML.
+            pass
+
+    res = model_from_yaml(model, path.read_text())
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+    with tmp_path.open('wb') as f:
+        pickle.dump((key, res), f)
+    os.replace(tmp_path, cache_path)
+    return res
 
 
 def validate_field(model: Type[T], field: str, value: Any):
@@ -0,0 +1,29 @@
+import pathlib
+import shutil
+
+import pytest
+
+from rbx import utils
+
+
+def test_copyfile(cleandir: pathlib.Path):
+    src = cleandir / 'src.txt'
+    src.write_text('content')
+
+    utils.copyfile(src, cleandir / 'dst.txt')
+
+    assert (cleandir / 'dst.txt').read_text() == 'content'
+
+
+def test_copyfile_onto_itself_keeps_content(cleandir: pathlib.Path):
+    src = cleandir / 'src.txt'
+    src.write_text('content')
+    link = cleandir / 'link.txt'
+    link.symlink_to(src)
+
+    with pytest.raises(shutil.SameFileError):
+        utils.copyfile(src, src)
+    with pytest.raises(shutil.SameFileError):
+        utils.copyfile(src, link)
+
+    assert src.read_text() == 'content'